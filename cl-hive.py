@@ -2226,6 +2226,11 @@ def init(options: Dict[str, Any], configuration: Dict[str, Any], plugin: Plugin,
         our_pubkey=our_pubkey,
     )
     plugin.log("cl-hive: Management schema registry initialized")
+    # Sign any batched receipts a previous run stored but never signed
+    try:
+        management_schema_registry.requeue_unsigned_receipts()
+    except Exception as e:
+        plugin.log(f"cl-hive: requeue of unsigned receipts failed: {e}", level='warn')
 
     # Wire DID credential manager into planner for reputation-weighted expansion
     if planner and did_credential_mgr:
@@ -2435,6 +2440,12 @@ def init(options: Dict[str, Any], configuration: Dict[str, Any], plugin: Plugin,
                 cashu_escrow_mgr.shutdown()
         except Exception:
             pass  # Best-effort on shutdown
+        try:
+            if management_schema_registry:
+                management_schema_registry.stop()
+                management_schema_registry.flush_pending_receipts()
+        except Exception:
+            pass  # Best-effort on shutdown
         try:
             if _batched_log_writer:
                 _batched_log_writer.stop()
@@ -4773,12 +4784,19 @@ def handle_mgmt_credential_present(peer_id: str, payload: Dict, plugin) -> Dict:
             _emit_ack(peer_id, payload.get("event_id") or _eid)
             return {"result": "continue"}
 
-    # Process credential
+    # Process credential. Valid presents are verified and stored by the
+    # registry's coalesced flush, which emits the ack once that is done.
+    ack_id = payload.get("event_id") or _eid
+    queued = False
     if management_schema_registry:
-        management_schema_registry.handle_mgmt_credential_present(actual_sender, payload)
+        queued = management_schema_registry.queue_mgmt_credential_present(
+            actual_sender, payload,
+            on_processed=lambda _accepted: _emit_ack(peer_id, ack_id),
+        )
 
-    # P3-H-2 fix: Emit ack after successful processing
-    _emit_ack(peer_id, payload.get("event_id") or _eid)
+    # P3-H-2 fix: Emit ack after processing (here only if rejected up front)
+    if not queued:
+        _emit_ack(peer_id, ack_id)
 
     # P3-M-3 fix: Relay to other members
     _relay_message(HiveMessageType.MGMT_CREDENTIAL_PRESENT, payload, peer_id)
@@ -4897,6 +4915,11 @@ def did_maintenance_loop():
                 )
                 last_rebroadcast = now
 
+            # 5. Backstop for the registry's receipt timer: sign any
+            #    low-danger management receipts still pending
+            if management_schema_registry:
+                management_schema_registry.flush_pending_receipts()
+
         except Exception as e:
             plugin.log(f"cl-hive: did_maintenance_loop error: {e}", level='warn')
 
@@ -17243,6 +17266,7 @@ def hive_settlement_calculate(plugin: Plugin):
     pool_status = routing_pool.get_pool_status(period=current_period)
     gathered = settlement_mgr.gather_contributions_from_gossip(state_manager, current_period)
 
+    offers = settlement_mgr.get_offers([str(c.get("peer_id", "")) for c in gathered])
     member_contributions = []
     for contrib in gathered:
         peer_id = str(contrib.get("peer_id", ""))
@@ -17250,7 +17274,7 @@ def hive_settlement_calculate(plugin: Plugin):
             continue
 
         uptime = int(contrib.get("uptime", 100) or 100)
-        offer = settlement_mgr.get_offer(peer_id)
+        offer = offers.get(peer_id)
         member_contributions.append(MemberContribution(
             peer_id=peer_id,
             capacity_sats=int(contrib.get("capacity", 0) or 0),
@@ -17373,13 +17397,14 @@ def hive_settlement_execute(plugin: Plugin, dry_run: bool = True):
     period = settlement_mgr.get_period_string()
     gathered = settlement_mgr.gather_contributions_from_gossip(state_manager, period)
 
+    offers = settlement_mgr.get_offers([str(c.get("peer_id", "")) for c in gathered])
     member_contributions = []
     for contrib in gathered:
         peer_id = str(contrib.get("peer_id", ""))
         if not peer_id:
             continue
         uptime = int(contrib.get("uptime", 100) or 100)
-        offer = settlement_mgr.get_offer(peer_id)
+        offer = offers.get(peer_id)
         member_contributions.append(MemberContribution(
             peer_id=peer_id,
             capacity_sats=int(contrib.get("capacity", 0) or 0),
@@ -40,6 +40,12 @@ class HiveDatabase:
     - WAL mode enabled for better concurrent read/write performance
     """
     
+    # Per-connection prepared statement cache (sqlite3 default is 128)
+    STATEMENT_CACHE_SIZE = 512
+    # Per-connection page cache in KiB (sqlite3 default is ~2 MiB); every
+    # thread holds its own, so this stays well below "cache everything"
+    PAGE_CACHE_KIB = 16384
+
     def __init__(self, db_path: str, plugin):
         """
         Initialize the database manager.
@@ -74,12 +80,21 @@ class HiveDatabase:
             self._local.conn = sqlite3.connect(
                 self.db_path,
                 isolation_level=None,  # Autocommit mode - critical for multi-threaded access
-                timeout=30.0  # Wait up to 30s for locks instead of failing immediately
+                timeout=30.0,  # Wait up to 30s for locks instead of failing immediately
+                # Hundreds of distinct statements share each thread's connection;
+                # the default 128-entry prepared-statement cache thrashes.
+                cached_statements=self.STATEMENT_CACHE_SIZE,
             )
             self._local.conn.row_factory = sqlite3.Row
 
             # Enable Write-Ahead Logging for better multi-thread concurrency
             self._local.conn.execute("PRAGMA journal_mode=WAL;")
+            # WAL makes NORMAL crash-safe (no corruption); commits skip the
+            # per-transaction fsync and sync at checkpoints instead.
+            self._local.conn.execute("PRAGMA synchronous=NORMAL;")
+            # Sorts and temp indexes (GROUP BY, ORDER BY) stay off disk
+            self._local.conn.execute("PRAGMA temp_store=MEMORY;")
+            self._local.conn.execute(f"PRAGMA cache_size=-{int(self.PAGE_CACHE_KIB)};")
             # Enable foreign key enforcement (required per-connection in SQLite)
             self._local.conn.execute("PRAGMA foreign_keys=ON;")
             
@@ -1500,6 +1515,14 @@ class HiveDatabase:
             CREATE INDEX IF NOT EXISTS idx_mp_reputation
             ON marketplace_profiles(reputation_score DESC)
         """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_mp_reputation_seen
+            ON marketplace_profiles(reputation_score DESC, last_seen DESC)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_mp_last_seen
+            ON marketplace_profiles(last_seen)
+        """)
 
         # Phase 5B: Advisor marketplace contracts
         conn.execute("""
@@ -1532,6 +1555,10 @@ class HiveDatabase:
             CREATE INDEX IF NOT EXISTS idx_contract_status
             ON marketplace_contracts(status)
         """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_contract_status_end
+            ON marketplace_contracts(status, contract_end)
+        """)
 
         # Phase 5B: Advisor trial records
         conn.execute("""
@@ -1553,6 +1580,20 @@ class HiveDatabase:
             CREATE INDEX IF NOT EXISTS idx_trial_node_scope
             ON marketplace_trials(node_id, scope, start_at)
         """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trial_contract
+            ON marketplace_trials(contract_id, start_at)
+        """)
+        # Partial indexes over open (un-evaluated) trials: active-trial caps
+        # and expiry sweeps only ever look at outcome IS NULL rows.
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trial_open_node
+            ON marketplace_trials(node_id) WHERE outcome IS NULL
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trial_open_end
+            ON marketplace_trials(end_at) WHERE outcome IS NULL
+        """)
 
         # Phase 5C: Liquidity offers
         conn.execute("""
@@ -6891,6 +6932,17 @@ class HiveDatabase:
         """, (proposal_id, from_peer_id, to_peer_id)).fetchone()
         return dict(row) if row else None
 
+    def get_settlement_sub_payments(
+        self, proposal_id: str, from_peer_id: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get all of a payer's sub-payment records for a proposal, keyed by to_peer_id."""
+        conn = self._get_connection()
+        rows = conn.execute("""
+            SELECT * FROM settlement_sub_payments
+            WHERE proposal_id = ? AND from_peer_id = ?
+        """, (proposal_id, from_peer_id)).fetchall()
+        return {row["to_peer_id"]: dict(row) for row in rows}
+
     def is_period_settled(self, period: str) -> bool:
         """Check if a period has already been settled."""
         conn = self._get_connection()
@@ -7831,6 +7883,24 @@ class HiveDatabase:
         ).fetchone()
         return dict(row) if row else None
 
+    def get_did_reputation_caches(self, subject_ids: List[str],
+                                   domain: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Get cached reputations for many subjects, keyed by subject_id."""
+        conn = self._get_connection()
+        target_domain = domain or "_all"
+        ids = list(dict.fromkeys(subject_ids))
+        result: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT * FROM did_reputation_cache WHERE domain = ? AND subject_id IN ({placeholders})",
+                [target_domain, *chunk]
+            ).fetchall()
+            for row in rows:
+                result[row["subject_id"]] = dict(row)
+        return result
+
     def get_stale_did_reputation_cache(self, before_ts: int,
                                         limit: int = 50) -> List[Dict[str, Any]]:
         """Get reputation cache entries computed before the given timestamp."""
@@ -7890,6 +7960,19 @@ class HiveDatabase:
         ).fetchone()
         return dict(row) if row else None
 
+    def get_management_credentials_by_ids(
+            self, credential_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get management credentials by ID in one query, keyed by credential_id."""
+        if not credential_ids:
+            return {}
+        conn = self._get_connection()
+        placeholders = ",".join("?" * len(credential_ids))
+        rows = conn.execute(
+            f"SELECT * FROM management_credentials WHERE credential_id IN ({placeholders})",
+            list(credential_ids)
+        ).fetchall()
+        return {r['credential_id']: dict(r) for r in rows}
+
     def get_management_credentials(self, agent_id: Optional[str] = None,
                                     node_id: Optional[str] = None,
                                     limit: int = 100) -> List[Dict[str, Any]]:
@@ -7978,6 +8061,40 @@ class HiveDatabase:
             )
             return False
 
+    def update_management_receipt_signatures(
+            self, updates: List[Tuple[str, str]]) -> bool:
+        """
+        Set executor_signature for many receipts atomically.
+
+        updates is a list of (executor_signature, receipt_id) pairs.
+        Returns True on success.
+        """
+        try:
+            with self.transaction() as conn:
+                conn.executemany(
+                    "UPDATE management_receipts SET executor_signature = ? "
+                    "WHERE receipt_id = ?",
+                    updates
+                )
+            return True
+        except Exception as e:
+            self.plugin.log(
+                f"HiveDatabase: update_management_receipt_signatures error: {e}",
+                level='error'
+            )
+            return False
+
+    def get_unsigned_management_receipts(self, marker: str,
+                                         limit: int = 1000) -> List[Dict[str, Any]]:
+        """Get receipts whose executor_signature is still the given pending marker."""
+        conn = self._get_connection()
+        rows = conn.execute(
+            "SELECT * FROM management_receipts WHERE executor_signature = ? "
+            "ORDER BY executed_at LIMIT ?",
+            (marker, limit)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
     def get_management_receipts(self, credential_id: str,
                                  limit: int = 100) -> List[Dict[str, Any]]:
         """Get management receipts for a credential."""
@@ -8029,6 +8146,44 @@ class HiveDatabase:
             )
             return False
 
+    def set_nostr_states(self, items: Dict[str, str]) -> bool:
+        """
+        Set several Nostr state keys in one transaction.
+
+        All-or-nothing: rejected if any key/value is invalid or if the new
+        keys would push the table past MAX_NOSTR_STATE_ROWS.
+        """
+        if not items or any(not key or value is None for key, value in items.items()):
+            return False
+
+        try:
+            with self.transaction() as conn:
+                placeholders = ",".join("?" * len(items))
+                existing = conn.execute(
+                    f"SELECT COUNT(*) FROM nostr_state WHERE key IN ({placeholders})",
+                    tuple(items)
+                ).fetchone()[0]
+                new_keys = len(items) - existing
+                if new_keys:
+                    total = conn.execute("SELECT COUNT(*) FROM nostr_state").fetchone()[0]
+                    if total + new_keys > self.MAX_NOSTR_STATE_ROWS:
+                        self.plugin.log(
+                            f"HiveDatabase: nostr_state at cap ({self.MAX_NOSTR_STATE_ROWS}), rejecting new keys",
+                            level='warn'
+                        )
+                        return False
+                conn.executemany(
+                    "INSERT OR REPLACE INTO nostr_state (key, value) VALUES (?, ?)",
+                    list(items.items())
+                )
+            return True
+        except Exception as e:
+            self.plugin.log(
+                f"HiveDatabase: set_nostr_states error: {e}",
+                level='error'
+            )
+            return False
+
     def get_nostr_state(self, key: str) -> Optional[str]:
         """Get a Nostr state value by key."""
         conn = self._get_connection()
@@ -8071,18 +8226,19 @@ class HiveDatabase:
             ).fetchall()
         return [dict(r) for r in rows]
 
+    _COUNTABLE_TABLES = frozenset({
+        "marketplace_profiles",
+        "marketplace_contracts",
+        "marketplace_trials",
+        "liquidity_offers",
+        "liquidity_leases",
+        "liquidity_heartbeats",
+        "nostr_state",
+    })
+
     def count_rows(self, table_name: str) -> int:
         """Count rows in selected internal tables."""
-        allowed_tables = {
-            "marketplace_profiles",
-            "marketplace_contracts",
-            "marketplace_trials",
-            "liquidity_offers",
-            "liquidity_leases",
-            "liquidity_heartbeats",
-            "nostr_state",
-        }
-        if table_name not in allowed_tables:
+        if table_name not in self._COUNTABLE_TABLES:
             raise ValueError(f"count_rows: table not allowed: {table_name}")
         conn = self._get_connection()
         row = conn.execute(
@@ -8090,6 +8246,24 @@ class HiveDatabase:
         ).fetchone()
         return int(row["cnt"]) if row else 0
 
+    def has_at_least_rows(self, table_name: str, limit: int) -> bool:
+        """
+        Check whether a selected internal table holds at least `limit` rows.
+
+        Probes a single row at OFFSET limit-1 instead of counting, so row-cap
+        checks stop after `limit` rows rather than scanning the table.
+        """
+        if table_name not in self._COUNTABLE_TABLES:
+            raise ValueError(f"has_at_least_rows: table not allowed: {table_name}")
+        if limit <= 0:
+            return True
+        conn = self._get_connection()
+        row = conn.execute(
+            f"SELECT 1 FROM {table_name} LIMIT 1 OFFSET ?",
+            (limit - 1,)
+        ).fetchone()
+        return row is not None
+
     # =========================================================================
     # PHASE 4A: CASHU ESCROW OPERATIONS
     # =========================================================================
@@ -860,6 +860,33 @@ class DIDCredentialManager:
             return result.tier
         return "newcomer"
 
+    def get_credit_tiers(self, subject_ids: List[str]) -> Dict[str, str]:
+        """
+        get_credit_tier() for many subjects.
+
+        Memory-cache hits are read under one lock and the DB cache is read
+        in one query; only subjects missing from both are aggregated.
+        """
+        now = int(time.time())
+        tiers: Dict[str, str] = {}
+        with self._cache_lock:
+            for subject_id in subject_ids:
+                cached = self._aggregation_cache.get(f"{subject_id}:_all")
+                if cached and (now - cached.computed_at) < AGGREGATION_CACHE_TTL:
+                    tiers[subject_id] = cached.tier
+
+        missing = [s for s in dict.fromkeys(subject_ids) if s not in tiers]
+        if missing:
+            db_cached = self.db.get_did_reputation_caches(missing, "_all")
+            for subject_id in missing:
+                row = db_cached.get(subject_id)
+                if row and (now - row.get("computed_at", 0)) < AGGREGATION_CACHE_TTL:
+                    tiers[subject_id] = row.get("tier", "newcomer")
+                else:
+                    result = self.aggregate_reputation(subject_id)
+                    tiers[subject_id] = result.tier if result else "newcomer"
+        return tiers
+
     # --- Incoming Credential Handling ---
 
     def handle_credential_present(
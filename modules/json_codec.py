@@ -0,0 +1,82 @@
+"""
+Shared JSON encode/decode helpers for cl-hive.
+
+Uses orjson when it is installed and stdlib json otherwise. Output and
+parse results are identical either way:
+
+- dumps() is byte-identical to json.dumps(obj, sort_keys=..., ensure_ascii=...,
+  separators=(",", ":")). orjson is only used for trees of plain
+  dict/list/tuple/str/int/bool/None values, where its encoding matches
+  stdlib; floats (whose exponent form differs, and NaN/Infinity, which
+  orjson writes as null) and anything else go through stdlib.
+- loads() returns what json.loads() returns. Text that orjson rejects
+  (NaN, Infinity, ...) or that holds integers too long for orjson to keep
+  exact goes through stdlib.
+"""
+
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+# Any 19+ digit run may be an integer beyond 64 bits, which orjson turns
+# into a float; stdlib keeps it exact
+_LONG_DIGITS = re.compile(r"\d{19}")
+_LONG_DIGITS_B = re.compile(rb"\d{19}")
+
+_PLAIN_SCALARS = frozenset((str, int, bool, type(None)))
+
+
+def _orjson_safe(obj: Any) -> bool:
+    """True if obj holds only values orjson encodes exactly like stdlib json."""
+    t = type(obj)
+    if t in _PLAIN_SCALARS:
+        return True
+    if t is dict:
+        return all(_orjson_safe(v) for v in obj.values())
+    if t is list or t is tuple:
+        return all(_orjson_safe(v) for v in obj)
+    return False
+
+
+def dumps(obj: Any, *, sort_keys: bool = False, ensure_ascii: bool = True) -> str:
+    """Compact JSON, byte-identical to stdlib json.dumps with the same options."""
+    if orjson is not None and _orjson_safe(obj):
+        try:
+            out = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode()
+        except TypeError:
+            pass  # non-str keys / ints beyond 64 bits
+        else:
+            # orjson never \u-escapes; only pure-ASCII output matches then
+            if not ensure_ascii or out.isascii():
+                return out
+    return json.dumps(obj, sort_keys=sort_keys, ensure_ascii=ensure_ascii,
+                      separators=(",", ":"))
+
+
+def dumps_utf8(obj: Any, *, sort_keys: bool = False) -> bytes:
+    """dumps(obj, ensure_ascii=False) encoded as UTF-8."""
+    if orjson is not None and _orjson_safe(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+        except TypeError:
+            pass  # non-str keys / ints beyond 64 bits
+    return json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON text (str or bytes); same result as json.loads()."""
+    if orjson is not None:
+        long_digits = _LONG_DIGITS if isinstance(data, str) else _LONG_DIGITS_B
+        if long_digits.search(data) is None:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass  # NaN / Infinity and other stdlib-only syntax
+    return json.loads(data)
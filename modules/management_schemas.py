@@ -25,7 +25,7 @@ import threading
 import time
 import uuid
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 # --- Constants ---
@@ -37,6 +37,22 @@ MAX_CONSTRAINTS_LEN = 4096
 MAX_MGMT_CREDENTIAL_PRESENTS_PER_PEER_PER_HOUR = 20
 MAX_MGMT_CREDENTIAL_REVOKES_PER_PEER_PER_HOUR = 10
 
+# Adaptive receipt signing: receipts for actions at or below this danger
+# total are Merkle-batched and only the batch root is HSM-signed.
+RECEIPT_BATCH_MAX_DANGER = 1
+RECEIPT_BATCH_SIZE = 16
+RECEIPT_BATCH_MAX_AGE_SECONDS = 60
+RECEIPT_BATCH_RETRY_SECONDS = 30
+# executor_signature of a batched receipt stored before its batch is signed
+RECEIPT_SIGNATURE_PENDING = "pending"
+
+# Bounded cache of issuer signatures already verified via checkmessage
+MAX_VERIFIED_SIGNATURE_CACHE = 1_000
+
+# Coalescing window for bursts of incoming credential presents
+CREDENTIAL_PRESENT_COALESCE_SECONDS = 0.02
+MAX_COALESCED_PRESENTS = 200
+
 VALID_TIERS = frozenset(["monitor", "standard", "advanced", "admin"])
 
 # Base pricing per danger point (sats) — used for future escrow integration
@@ -584,22 +600,130 @@ TIER_HIERARCHY = {
 }
 
 
+# --- Precomputed schema pattern lookup ---
+
+# Every allowed_schemas pattern that matches at least one registered schema:
+# "*", each exact schema_id, and each "<prefix>/*" wildcard whose prefix is
+# followed by "/" in some schema_id. Lets issue_credential validate a pattern
+# with one set lookup instead of scanning SCHEMA_REGISTRY.
+VALID_SCHEMA_PATTERNS = frozenset(
+    ["*"]
+    + list(SCHEMA_REGISTRY)
+    + [
+        sid[:i] + "/*"
+        for sid in SCHEMA_REGISTRY
+        for i, ch in enumerate(sid) if ch == "/"
+    ]
+)
+
+
 # --- Helper Functions ---
 
+def encode_credential_signing_payload(credential: Dict[str, Any]) -> Tuple[str, str, str]:
+    """
+    Build the deterministic management credential signing payload.
+
+    Equivalent to json.dumps(signing_data, sort_keys=True, separators=(',', ':'))
+    but assembled from individually encoded fields (keys in sorted order), so
+    the allowed_schemas and constraints fragments can be reused for storage
+    without serializing them again.
+
+    Returns:
+        (signing_payload, allowed_schemas_json, constraints_json) tuple
+    """
+    compact = (',', ':')
+    schemas_json = json.dumps(credential.get("allowed_schemas", []),
+                              sort_keys=True, separators=compact)
+    constraints_json = json.dumps(credential.get("constraints", {}),
+                                  sort_keys=True, separators=compact)
+    payload = "".join((
+        '{"agent_id":', json.dumps(credential.get("agent_id", "")),
+        ',"allowed_schemas":', schemas_json,
+        ',"constraints":', constraints_json,
+        ',"credential_id":', json.dumps(credential.get("credential_id", "")),
+        ',"issuer_id":', json.dumps(credential.get("issuer_id", "")),
+        ',"node_id":', json.dumps(credential.get("node_id", "")),
+        ',"tier":', json.dumps(credential.get("tier", "")),
+        ',"valid_from":', json.dumps(credential.get("valid_from", 0)),
+        ',"valid_until":', json.dumps(credential.get("valid_until", 0)),
+        '}',
+    ))
+    return payload, schemas_json, constraints_json
+
+
 def get_credential_signing_payload(credential: Dict[str, Any]) -> str:
     """Build deterministic JSON string for management credential signing."""
-    signing_data = {
-        "credential_id": credential.get("credential_id", ""),
-        "issuer_id": credential.get("issuer_id", ""),
-        "agent_id": credential.get("agent_id", ""),
-        "node_id": credential.get("node_id", ""),
-        "tier": credential.get("tier", ""),
-        "allowed_schemas": credential.get("allowed_schemas", []),
-        "constraints": credential.get("constraints", {}),
-        "valid_from": credential.get("valid_from", 0),
-        "valid_until": credential.get("valid_until", 0),
-    }
-    return json.dumps(signing_data, sort_keys=True, separators=(',', ':'))
+    return encode_credential_signing_payload(credential)[0]
+
+
+def _prehash(payload: bytes) -> bytes:
+    """SHA-256 digest of a signing payload (fixed-length HSM input, cache key)."""
+    return hashlib.sha256(payload).digest()
+
+
+def _merkle_root_and_proofs(leaves: List[bytes]) -> Tuple[bytes, List[List[bytes]]]:
+    """
+    Build a SHA-256 Merkle tree over leaf hashes.
+
+    Odd levels duplicate their last node. Returns (root, proofs) where
+    proofs[i] lists the sibling hashes from leaf i up to the root.
+    """
+    proofs: List[List[bytes]] = [[] for _ in leaves]
+    positions = list(range(len(leaves)))
+    level = list(leaves)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        for i, pos in enumerate(positions):
+            proofs[i].append(level[pos ^ 1])
+            positions[i] = pos // 2
+        level = [
+            hashlib.sha256(level[j] + level[j + 1]).digest()
+            for j in range(0, len(level), 2)
+        ]
+    return level[0], proofs
+
+
+def verify_receipt_merkle_proof(leaf: bytes, index: int, proof: List[bytes],
+                                root: bytes) -> bool:
+    """Check that a receipt leaf hash is included under a batch Merkle root."""
+    node = leaf
+    for sibling in proof:
+        if index % 2:
+            node = hashlib.sha256(sibling + node).digest()
+        else:
+            node = hashlib.sha256(node + sibling).digest()
+        index //= 2
+    return node == root
+
+
+def _receipt_leaf(row: Dict[str, Any], params: Dict[str, Any],
+                  result: Optional[Dict[str, Any]]) -> bytes:
+    """Digest of a receipt's signing payload (the HSM input / Merkle leaf)."""
+    params_hash = hashlib.sha256(json.dumps(params, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+    result_hash = hashlib.sha256(json.dumps(result or {}, sort_keys=True, separators=(',', ':')).encode()).hexdigest() if result else ""
+    receipt_payload = json.dumps({
+        "receipt_id": row["receipt_id"],
+        "credential_id": row["credential_id"],
+        "schema_id": row["schema_id"],
+        "action": row["action"],
+        "danger_score": row["danger_score"],
+        "executed_at": row["executed_at"],
+        "params_hash": params_hash,
+        "result_hash": result_hash,
+        "state_hash_before": row["state_hash_before"] or "",
+        "state_hash_after": row["state_hash_after"] or "",
+    }, sort_keys=True, separators=(',', ':'))
+    return _prehash(receipt_payload.encode())
+
+
+def get_receipt_batch_signing_payload(merkle_root_hex: str, leaf_count: int) -> str:
+    """Build deterministic JSON string signed for a batch of low-danger receipts."""
+    return json.dumps({
+        "action": "mgmt_receipt_batch",
+        "leaf_count": leaf_count,
+        "merkle_root": merkle_root_hex,
+    }, sort_keys=True, separators=(',', ':'))
 
 
 def _is_valid_pubkey(pk: str) -> bool:
@@ -637,6 +761,29 @@ class ManagementSchemaRegistry:
         self.our_pubkey = our_pubkey
         self._rate_limiters: Dict[tuple, List[int]] = {}
         self._rate_lock = threading.Lock()
+        # Low-danger receipts stored unsigned, awaiting a batch signature
+        self._pending_low_danger: List[Dict[str, Any]] = []
+        self._pending_since = 0
+        self._receipt_retry_at = 0.0
+        self._receipt_lock = threading.Lock()
+        # (payload digest, signature, pubkey) tuples that checkmessage accepted
+        self._verified_sigs: Dict[Tuple[bytes, str, str], int] = {}
+        self._verified_lock = threading.Lock()
+        # (credential_id, signature) -> (peer_id, prepared present, callbacks)
+        # awaiting coalesced flush; every distinct signature is kept until
+        # verification decides which one is genuine
+        self._present_coalescer: Dict[
+            Tuple[str, str],
+            Tuple[str, Dict[str, Any], List[Callable[[bool], None]]],
+        ] = {}
+        self._present_lock = threading.Lock()
+        # One long-lived flush worker, started on first use, so the thread
+        # and its DB connection are reused across bursts. It also flushes
+        # pending receipts once they reach RECEIPT_BATCH_MAX_AGE_SECONDS.
+        self._flush_thread: Optional[threading.Thread] = None
+        self._flush_start_lock = threading.Lock()
+        self._flush_wake = threading.Event()
+        self._flush_stop = threading.Event()
 
     def _log(self, msg: str, level: str = "info"):
         try:
@@ -670,6 +817,35 @@ class ManagementSchemaRegistry:
 
         return True
 
+    def _checkmessage_cached(self, payload: str, signature: str, pubkey: str) -> Tuple[bool, str]:
+        """
+        Verify a signature via checkmessage, skipping the RPC for payloads
+        already verified (keyed by payload digest).
+
+        Returns:
+            (verified, reason) tuple
+        """
+        key = (_prehash(payload.encode()), signature, pubkey)
+        with self._verified_lock:
+            if key in self._verified_sigs:
+                return True, "cached"
+
+        result = self.rpc.checkmessage(payload, signature, pubkey)
+        if not isinstance(result, dict):
+            return False, "unexpected checkmessage response type"
+        if not result.get("verified", False):
+            return False, "signature verification failed"
+        if not result.get("pubkey", "") or result.get("pubkey", "") != pubkey:
+            return False, "signature pubkey mismatch"
+
+        with self._verified_lock:
+            if len(self._verified_sigs) >= MAX_VERIFIED_SIGNATURE_CACHE:
+                # Drop the oldest half (dicts preserve insertion order)
+                for k in list(self._verified_sigs)[:MAX_VERIFIED_SIGNATURE_CACHE // 2]:
+                    del self._verified_sigs[k]
+            self._verified_sigs[key] = int(time.time())
+        return True, "verified"
+
     # --- Schema Queries ---
 
     def list_schemas(self) -> Dict[str, Dict[str, Any]]:
@@ -859,16 +1035,13 @@ class ManagementSchemaRegistry:
             return None
 
         for schema_pattern in allowed_schemas:
-            if schema_pattern == "*":
+            if schema_pattern in VALID_SCHEMA_PATTERNS:
                 continue
             if schema_pattern.endswith("/*"):
-                prefix = schema_pattern[:-2]
-                if not any(sid.startswith(prefix + "/") for sid in SCHEMA_REGISTRY):
-                    self._log(f"allowed_schemas pattern '{schema_pattern}' matches no known schemas", "warn")
-                    return None
-            elif schema_pattern not in SCHEMA_REGISTRY:
+                self._log(f"allowed_schemas pattern '{schema_pattern}' matches no known schemas", "warn")
+            else:
                 self._log(f"allowed_schemas entry '{schema_pattern}' is not a known schema", "warn")
-                return None
+            return None
 
         if not isinstance(valid_days, int) or valid_days <= 0:
             self._log(f"invalid valid_days: {valid_days}", "warn")
@@ -1008,6 +1181,12 @@ class ManagementSchemaRegistry:
         """
         Record a management action receipt.
 
+        Receipts for low-danger actions (danger <= RECEIPT_BATCH_MAX_DANGER)
+        are stored immediately with a RECEIPT_SIGNATURE_PENDING marker and
+        signed as a Merkle batch once RECEIPT_BATCH_SIZE receipts accumulate
+        or the oldest is RECEIPT_BATCH_MAX_AGE_SECONDS old; see
+        flush_pending_receipts(). All others are signed before being stored.
+
         Returns receipt_id on success, None on failure.
         """
         cred = self.db.get_management_credential(credential_id)
@@ -1033,50 +1212,162 @@ class ManagementSchemaRegistry:
         receipt_id = str(uuid.uuid4())
         now = int(time.time())
 
-        # Sign the receipt (include hashes of params/result/state)
-        signature = ""
-        if self.rpc:
-            params_hash = hashlib.sha256(json.dumps(params, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
-            result_hash = hashlib.sha256(json.dumps(result or {}, sort_keys=True, separators=(',', ':')).encode()).hexdigest() if result else ""
-            receipt_payload = json.dumps({
-                "receipt_id": receipt_id,
-                "credential_id": credential_id,
-                "schema_id": schema_id,
-                "action": action,
-                "danger_score": danger.total,
-                "executed_at": now,
-                "params_hash": params_hash,
-                "result_hash": result_hash,
-                "state_hash_before": state_hash_before or "",
-                "state_hash_after": state_hash_after or "",
-            }, sort_keys=True, separators=(',', ':'))
-            try:
-                sig_result = self.rpc.signmessage(receipt_payload)
-                signature = sig_result.get("zbase", "") if isinstance(sig_result, dict) else str(sig_result)
-            except Exception as e:
-                self._log(f"receipt signing failed: {e}", "warn")
-                return None  # Don't store unsigned receipts
+        receipt_row = {
+            "receipt_id": receipt_id,
+            "credential_id": credential_id,
+            "schema_id": schema_id,
+            "action": action,
+            "params_json": json.dumps(params),
+            "danger_score": danger.total,
+            "result_json": json.dumps(result) if result else None,
+            "state_hash_before": state_hash_before,
+            "state_hash_after": state_hash_after,
+            "executed_at": now,
+        }
 
-            if not isinstance(signature, str) or not signature:
-                self._log("receipt signing returned empty or malformed signature", "error")
+        # Sign the receipt (include hashes of params/result/state).
+        # Receipts are stored and checked locally only, so the HSM signs the
+        # fixed-length payload digest rather than the full JSON.
+        receipt_digest = _receipt_leaf(receipt_row, params, result)
+
+        # Low-danger receipts are Merkle-batched: each is stored at once with
+        # a pending marker, and the batch signature plus its inclusion proof
+        # are filled in when the batch root is signed.
+        if danger.total <= RECEIPT_BATCH_MAX_DANGER:
+            if not self.db.store_management_receipt(
+                executor_signature=RECEIPT_SIGNATURE_PENDING, **receipt_row
+            ):
                 return None
+            with self._receipt_lock:
+                if not self._pending_low_danger:
+                    self._pending_since = now
+                self._pending_low_danger.append(
+                    {"leaf": receipt_digest, "receipt_id": receipt_id}
+                )
+                due = len(self._pending_low_danger) >= RECEIPT_BATCH_SIZE
+            if due:
+                self.flush_pending_receipts()
+            else:
+                self._start_flush_worker()
+                self._flush_wake.set()
+            return receipt_id
+
+        try:
+            sig_result = self.rpc.signmessage(receipt_digest.hex())
+            signature = sig_result.get("zbase", "") if isinstance(sig_result, dict) else str(sig_result)
+        except Exception as e:
+            self._log(f"receipt signing failed: {e}", "warn")
+            return None  # Don't store unsigned receipts
+
+        if not isinstance(signature, str) or not signature:
+            self._log("receipt signing returned empty or malformed signature", "error")
+            return None
 
         stored = self.db.store_management_receipt(
-            receipt_id=receipt_id,
-            credential_id=credential_id,
-            schema_id=schema_id,
-            action=action,
-            params_json=json.dumps(params),
-            danger_score=danger.total,
-            result_json=json.dumps(result) if result else None,
-            state_hash_before=state_hash_before,
-            state_hash_after=state_hash_after,
-            executed_at=now,
-            executor_signature=signature,
+            executor_signature=signature, **receipt_row
         )
 
         return receipt_id if stored else None
 
+    def requeue_unsigned_receipts(self) -> int:
+        """
+        Queue batched receipts left unsigned by a previous run for signing.
+
+        Returns the number of receipts queued.
+        """
+        rows = self.db.get_unsigned_management_receipts(RECEIPT_SIGNATURE_PENDING)
+        entries = []
+        for row in rows:
+            try:
+                params = json.loads(row["params_json"])
+                result = json.loads(row["result_json"]) if row.get("result_json") else None
+                entries.append({
+                    "leaf": _receipt_leaf(row, params, result),
+                    "receipt_id": row["receipt_id"],
+                })
+            except Exception as e:
+                self._log(f"cannot requeue receipt {str(row.get('receipt_id'))[:8]}...: {e}", "warn")
+        if not entries:
+            return 0
+        with self._receipt_lock:
+            if not self._pending_low_danger:
+                self._pending_since = min(row["executed_at"] for row in rows)
+            self._pending_low_danger[:0] = entries
+        self._start_flush_worker()
+        self._flush_wake.set()
+        return len(entries)
+
+    def flush_pending_receipts(self) -> bool:
+        """
+        Sign all pending low-danger receipts as one Merkle batch.
+
+        The HSM signs only the batch root. Each stored receipt's
+        executor_signature is then updated from the pending marker to the
+        batch signature, root, and its own inclusion proof. If signing or
+        the update fails, the batch is put back and retried after
+        RECEIPT_BATCH_RETRY_SECONDS.
+
+        Returns True if the batch was signed (or nothing was pending).
+        """
+        with self._receipt_lock:
+            batch = self._pending_low_danger
+            pending_since = self._pending_since
+            self._pending_low_danger = []
+            self._pending_since = 0
+
+        if not batch:
+            return True
+
+        signed = False
+        if not self.rpc:
+            self._log(f"cannot sign {len(batch)} pending receipts: no RPC", "warn")
+        else:
+            root, proofs = _merkle_root_and_proofs([entry["leaf"] for entry in batch])
+            root_hex = root.hex()
+            try:
+                sig_result = self.rpc.signmessage(
+                    get_receipt_batch_signing_payload(root_hex, len(batch))
+                )
+                signature = sig_result.get("zbase", "") if isinstance(sig_result, dict) else str(sig_result)
+            except Exception as e:
+                self._log(f"receipt batch signing failed for {len(batch)} receipts: {e}", "warn")
+                signature = ""
+            else:
+                if not isinstance(signature, str) or not signature:
+                    self._log(f"receipt batch signing returned empty or malformed signature "
+                              f"for {len(batch)} receipts", "error")
+                    signature = ""
+
+            if signature:
+                updates = []
+                for index, (entry, proof) in enumerate(zip(batch, proofs)):
+                    executor_signature = json.dumps({
+                        "batch_signature": signature,
+                        "merkle_root": root_hex,
+                        "leaf_count": len(batch),
+                        "index": index,
+                        "proof": [p.hex() for p in proof],
+                    }, sort_keys=True, separators=(',', ':'))
+                    updates.append((executor_signature, entry["receipt_id"]))
+                signed = self.db.update_management_receipt_signatures(updates)
+
+        if not signed:
+            # Put the batch back ahead of anything queued meanwhile
+            with self._receipt_lock:
+                self._pending_low_danger[:0] = batch
+                self._pending_since = pending_since
+                self._receipt_retry_at = time.time() + RECEIPT_BATCH_RETRY_SECONDS
+        return signed
+
+    def _receipt_flush_delay(self) -> Optional[float]:
+        """Seconds until pending receipts are due for signing, or None."""
+        with self._receipt_lock:
+            if not self._pending_low_danger:
+                return None
+            due_at = max(self._pending_since + RECEIPT_BATCH_MAX_AGE_SECONDS,
+                         self._receipt_retry_at)
+        return max(0.0, due_at - time.time())
+
     # --- Protocol Gossip Handlers ---
 
     def handle_mgmt_credential_present(
@@ -1088,10 +1379,153 @@ class ManagementSchemaRegistry:
         Validates credential structure, verifies issuer signature,
         stores if new, and returns True if accepted.
         """
+        prepared = self._prepare_credential_present(peer_id, payload)
+        if prepared is None:
+            return False
+        existing = self.db.get_management_credential(prepared["credential_id"])
+        return self._absorb_credential_present(peer_id, prepared, existing)
+
+    def queue_mgmt_credential_present(
+        self,
+        peer_id: str,
+        payload: dict,
+        on_processed: Optional[Callable[[bool], None]] = None,
+    ) -> bool:
+        """
+        Validate an incoming MGMT_CREDENTIAL_PRESENT and queue it for
+        coalesced processing.
+
+        Presents arriving within CREDENTIAL_PRESENT_COALESCE_SECONDS are
+        absorbed together, with a single DB lookup for already-known
+        credentials. Only exact (credential_id, signature) repeats are merged
+        before verification. on_processed, if given, is called with the
+        accept/reject result once the present has been absorbed.
+
+        Returns True if the credential passed validation and was queued.
+        """
+        prepared = self._prepare_credential_present(peer_id, payload)
+        if prepared is None:
+            return False
+
+        flush_now = False
+        with self._present_lock:
+            key = (prepared["credential_id"], prepared["signature"])
+            entry = self._present_coalescer.get(key)
+            if entry is None:
+                entry = (peer_id, prepared, [])
+                self._present_coalescer[key] = entry
+            if on_processed is not None:
+                entry[2].append(on_processed)
+            flush_now = len(self._present_coalescer) >= MAX_COALESCED_PRESENTS
+
+        if flush_now:
+            self.flush_credential_presents()
+        else:
+            self._start_flush_worker()
+            self._flush_wake.set()
+        return True
+
+    def _start_flush_worker(self) -> None:
+        """Start the flush worker if it is not running."""
+        with self._flush_start_lock:
+            if self._flush_thread is not None or self._flush_stop.is_set():
+                return
+            self._flush_thread = threading.Thread(
+                target=self._flush_loop,
+                name="hive_mgmt_flush",
+                daemon=True,
+            )
+            self._flush_thread.start()
+
+    def _flush_loop(self) -> None:
+        """
+        Flush queued presents one coalescing window after each wake-up, and
+        pending receipts once they are due.
+        """
+        try:
+            while not self._flush_stop.is_set():
+                if self._flush_wake.wait(self._receipt_flush_delay()):
+                    self._flush_wake.clear()
+                    if self._flush_stop.wait(CREDENTIAL_PRESENT_COALESCE_SECONDS):
+                        break
+                    try:
+                        self.flush_credential_presents()
+                    except Exception as e:
+                        self._log(f"credential present flush error: {e}", "warn")
+                if self._receipt_flush_delay() == 0:
+                    try:
+                        self.flush_pending_receipts()
+                    except Exception as e:
+                        self._log(f"receipt flush error: {e}", "warn")
+        finally:
+            close = getattr(self.db, "close_connection", None)
+            if callable(close):
+                close()
+
+    def stop(self) -> None:
+        """Stop the flush worker and absorb any presents still queued."""
+        self._flush_stop.set()
+        self._flush_wake.set()
+        thread = self._flush_thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self.flush_credential_presents()
+
+    def flush_credential_presents(self) -> int:
+        """
+        Absorb all queued credential presents.
+
+        Returns the number of distinct credentials accepted.
+        """
+        with self._present_lock:
+            pending = self._present_coalescer
+            self._present_coalescer = {}
+
+        if not pending:
+            return 0
+
+        try:
+            existing_map = self.db.get_management_credentials_by_ids(
+                list({credential_id for credential_id, _ in pending})
+            )
+        except Exception as e:
+            self._log(f"credential present flush: lookup failed: {e}", "warn")
+            existing_map = None
+
+        accepted_ids = set()
+        for (credential_id, _), (peer_id, prepared, callbacks) in pending.items():
+            ok = False
+            if existing_map is not None:
+                try:
+                    ok = self._absorb_credential_present(
+                        peer_id, prepared, existing_map.get(credential_id)
+                    )
+                except Exception as e:
+                    self._log(f"credential present flush: {credential_id[:8]}... failed: {e}", "warn")
+            if ok:
+                accepted_ids.add(credential_id)
+                # Later copies with other signatures now dedup against this one
+                existing_map.setdefault(credential_id, {"signature": prepared["signature"]})
+            for callback in callbacks:
+                try:
+                    callback(ok)
+                except Exception as e:
+                    self._log(f"credential present flush: callback failed: {e}", "warn")
+        return len(accepted_ids)
+
+    def _prepare_credential_present(
+        self, peer_id: str, payload: dict
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Rate-limit and validate an MGMT_CREDENTIAL_PRESENT payload.
+
+        Returns the validated fields plus the signing payload and storage
+        JSON, or None if the credential is rejected.
+        """
         credential = payload.get("credential")
         if not isinstance(credential, dict):
             self._log("invalid mgmt_credential_present: missing credential dict", "warn")
-            return False
+            return None
 
         if not self._check_rate_limit(
             peer_id,
@@ -1099,17 +1533,17 @@ class ManagementSchemaRegistry:
             MAX_MGMT_CREDENTIAL_PRESENTS_PER_PEER_PER_HOUR,
         ):
             self._log(f"rate limit exceeded for mgmt credential presents from {peer_id[:16]}...", "warn")
-            return False
+            return None
 
         # Extract fields
         credential_id = credential.get("credential_id")
         if not credential_id or not isinstance(credential_id, str):
             self._log("mgmt_credential_present: missing credential_id", "warn")
-            return False
+            return None
 
         if len(credential_id) > 64:
             self._log("mgmt_credential_present: credential_id too long", "warn")
-            return False
+            return None
 
         issuer_id = credential.get("issuer_id", "")
         agent_id = credential.get("agent_id", "")
@@ -1124,64 +1558,62 @@ class ManagementSchemaRegistry:
         # Validate pubkey fields
         if not _is_valid_pubkey(issuer_id):
             self._log(f"mgmt_credential_present: invalid issuer_id pubkey: {issuer_id!r}", "warn")
-            return False
+            return None
 
         if not _is_valid_pubkey(agent_id):
             self._log(f"mgmt_credential_present: invalid agent_id pubkey: {agent_id!r}", "warn")
-            return False
+            return None
 
         if not _is_valid_pubkey(node_id):
             self._log(f"mgmt_credential_present: invalid node_id pubkey: {node_id!r}", "warn")
-            return False
+            return None
 
         # Basic field validation
         if tier not in VALID_TIERS:
             self._log(f"mgmt_credential_present: invalid tier {tier!r}", "warn")
-            return False
+            return None
 
         if not isinstance(allowed_schemas, list) or not allowed_schemas:
             self._log("mgmt_credential_present: bad allowed_schemas", "warn")
-            return False
+            return None
 
         if len(allowed_schemas) > 100:
             self._log("mgmt_credential_present: allowed_schemas exceeds 100 items", "warn")
-            return False
+            return None
 
         if not all(isinstance(s, str) for s in allowed_schemas):
             self._log("mgmt_credential_present: allowed_schemas contains non-string entries", "warn")
-            return False
+            return None
 
         # P2R4-I-2: Enforce key-count limit on constraints (dict or string form)
-        if isinstance(constraints, dict) and len(constraints) > 50:
-            self._log("mgmt_credential_present: constraints exceeds 50 keys", "warn")
-            return False
+        constraints_for_payload = constraints
         if isinstance(constraints, str):
             try:
-                parsed_constraints = json.loads(constraints)
-                if isinstance(parsed_constraints, dict) and len(parsed_constraints) > 50:
-                    self._log("mgmt_credential_present: constraints (string) exceeds 50 keys", "warn")
-                    return False
+                constraints_for_payload = json.loads(constraints)
             except (json.JSONDecodeError, TypeError):
                 self._log("mgmt_credential_present: constraints string is not valid JSON", "warn")
-                return False
+                return None
+        if isinstance(constraints_for_payload, dict) and len(constraints_for_payload) > 50:
+            self._log("mgmt_credential_present: constraints exceeds 50 keys", "warn")
+            return None
 
         if not isinstance(valid_from, int) or not isinstance(valid_until, int):
             self._log("mgmt_credential_present: bad validity period", "warn")
-            return False
+            return None
 
         if valid_until <= valid_from:
             self._log("mgmt_credential_present: valid_until <= valid_from", "warn")
-            return False
+            return None
 
         MAX_CREDENTIAL_VALIDITY_SECONDS = 730 * 86400  # 2 years
         if (valid_until - valid_from) > MAX_CREDENTIAL_VALIDITY_SECONDS:
             self._log("mgmt_credential_present: validity period too long", "warn")
-            return False
+            return None
 
         now = int(time.time())
         if valid_until < now:
             self._log(f"rejecting expired management credential from {peer_id[:16]}...", "info")
-            return False
+            return None
 
         # Self-issuance of management credential: issuer == agent is not
         # inherently invalid (operator can credential their own agent),
@@ -1190,76 +1622,91 @@ class ManagementSchemaRegistry:
         # Verify issuer signature (fail-closed)
         if not signature:
             self._log("mgmt_credential_present: missing signature", "warn")
-            return False
+            return None
 
         if not self.rpc:
             self._log("mgmt_credential_present: no RPC for sig verification", "warn")
-            return False
+            return None
 
-        # Build signing payload matching get_credential_signing_payload()
-        constraints_for_payload = constraints
-        if isinstance(constraints_for_payload, str):
-            try:
-                constraints_for_payload = json.loads(constraints_for_payload)
-            except (json.JSONDecodeError, TypeError):
-                constraints_for_payload = {}
+        # Build signing payload matching get_credential_signing_payload(),
+        # keeping the encoded fields for storage
+        signing_payload, allowed_schemas_json, constraints_payload_json = (
+            encode_credential_signing_payload({
+                "credential_id": credential_id,
+                "issuer_id": issuer_id,
+                "agent_id": agent_id,
+                "node_id": node_id,
+                "tier": tier,
+                "allowed_schemas": allowed_schemas,
+                "constraints": constraints_for_payload,
+                "valid_from": valid_from,
+                "valid_until": valid_until,
+            })
+        )
 
-        signing_data = {
+        return {
             "credential_id": credential_id,
             "issuer_id": issuer_id,
             "agent_id": agent_id,
             "node_id": node_id,
             "tier": tier,
-            "allowed_schemas": allowed_schemas,
-            "constraints": constraints_for_payload,
             "valid_from": valid_from,
             "valid_until": valid_until,
+            "signature": signature,
+            "signing_payload": signing_payload,
+            "allowed_schemas_json": allowed_schemas_json,
+            # Store the exact string form the issuer sent, else the encoded fragment
+            "constraints_json": (
+                constraints if isinstance(constraints, str)
+                else constraints_payload_json
+            ),
         }
-        signing_payload = json.dumps(signing_data, sort_keys=True, separators=(',', ':'))
+
+    def _absorb_credential_present(
+        self,
+        peer_id: str,
+        prepared: Dict[str, Any],
+        existing: Optional[Dict[str, Any]],
+    ) -> bool:
+        """Verify and store a prepared credential present. Returns True if accepted."""
+        credential_id = prepared["credential_id"]
+        issuer_id = prepared["issuer_id"]
+        signature = prepared["signature"]
+
+        # Content-level dedup: exact copy of a credential we already hold
+        if existing and existing.get("signature") == signature:
+            return True  # Idempotent
 
         try:
-            result = self.rpc.checkmessage(signing_payload, signature, issuer_id)
-            if not isinstance(result, dict):
-                self._log("mgmt_credential_present: unexpected checkmessage response type", "warn")
-                return False
-            if not result.get("verified", False):
-                self._log("mgmt_credential_present: signature verification failed", "warn")
-                return False
-            if not result.get("pubkey", "") or result.get("pubkey", "") != issuer_id:
-                self._log("mgmt_credential_present: signature pubkey mismatch", "warn")
+            verified, reason = self._checkmessage_cached(
+                prepared["signing_payload"], signature, issuer_id
+            )
+            if not verified:
+                self._log(f"mgmt_credential_present: {reason}", "warn")
                 return False
         except Exception as e:
             self._log(f"mgmt_credential_present: checkmessage error: {e}", "warn")
             return False
 
+        if existing:
+            return True  # Idempotent
+
         # Check row cap
         count = self.db.count_management_credentials()
         if count >= MAX_MANAGEMENT_CREDENTIALS:
             self._log("mgmt credential store at cap, rejecting", "warn")
             return False
 
-        # Content-level dedup: already have this credential?
-        existing = self.db.get_management_credential(credential_id)
-        if existing:
-            return True  # Idempotent
-
-        # Serialize for storage
-        allowed_schemas_json = json.dumps(allowed_schemas)
-        constraints_json = (
-            constraints if isinstance(constraints, str)
-            else json.dumps(constraints)
-        )
-
         stored = self.db.store_management_credential(
             credential_id=credential_id,
             issuer_id=issuer_id,
-            agent_id=agent_id,
-            node_id=node_id,
-            tier=tier,
-            allowed_schemas_json=allowed_schemas_json,
-            constraints_json=constraints_json,
-            valid_from=valid_from,
-            valid_until=valid_until,
+            agent_id=prepared["agent_id"],
+            node_id=prepared["node_id"],
+            tier=prepared["tier"],
+            allowed_schemas_json=prepared["allowed_schemas_json"],
+            constraints_json=prepared["constraints_json"],
+            valid_from=prepared["valid_from"],
+            valid_until=prepared["valid_until"],
             signature=signature,
         )
 
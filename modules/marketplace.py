@@ -1,9 +1,146 @@
 """Phase 5B advisor marketplace manager."""
 
-import json
+import os
+import re
+import threading
 import time
-import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from .json_codec import dumps as _json_dumps, loads as _loads
+
+
+def _new_id() -> str:
+    """Random 128-bit ID in the same hyphenated 8-4-4-4-12 layout as str(uuid4())."""
+    h = os.urandom(16).hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# Encoding of an empty object; lets common no-argument paths skip the encoder
+_EMPTY_JSON = "{}"
+
+
+def _dumps(obj: Any) -> str:
+    """Compact sorted-key JSON, as json.dumps(obj, sort_keys=True, separators=(",", ":"))."""
+    return _json_dumps(obj, sort_keys=True)
+
+
+def _encode_contract_proposal(contract_id: str, advisor_did: str, node_id: str,
+                              tier: Optional[str], scope_json: str,
+                              pricing_json: str) -> str:
+    """
+    Encode a contract_proposal DM with fixed, sorted field order.
+
+    Byte-identical to _dumps() of the equivalent dict, but splices in the
+    scope/pricing JSON already encoded for the contract row instead of
+    serializing and key-sorting them a second time.
+    """
+    return "".join((
+        '{"advisor_did":', _dumps(advisor_did),
+        ',"contract_id":', _dumps(contract_id),
+        ',"node_id":', _dumps(node_id),
+        ',"pricing":', pricing_json,
+        ',"scope":', scope_json,
+        ',"tier":', _dumps(tier),
+        ',"type":"contract_proposal"}',
+    ))
+
+
+def _encode_profile(profile: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Encode a profile plus its capabilities/pricing columns.
+
+    The capabilities and pricing sub-objects are encoded once and spliced
+    into profile_json (keys in sorted order), matching _dumps(profile).
+    """
+    capabilities_json = _dumps(profile.get("capabilities", {}))
+    pricing_json = _dumps(profile.get("pricing", {}))
+    if all(isinstance(k, str) for k in profile):
+        fragments = {"capabilities": capabilities_json, "pricing": pricing_json}
+        profile_json = "{" + ",".join(
+            _dumps(key) + ":" + (fragments[key] if key in fragments else _dumps(profile[key]))
+            for key in sorted(profile)
+        ) + "}"
+    else:
+        profile_json = _dumps(profile)
+    return {
+        "profile_json": profile_json,
+        "capabilities_json": capabilities_json,
+        "pricing_json": pricing_json,
+    }
+
+
+# 32-byte x-only Nostr pubkey in hex
+_HEX64_RE = re.compile(r"\A[0-9a-fA-F]{64}\Z")
+
+# Hot-path statements, shared so each thread's connection reuses one
+# prepared statement per shape from the sqlite3 statement cache.
+_SQL_INSERT_PROFILE = (
+    "INSERT OR REPLACE INTO marketplace_profiles "
+    "(advisor_did, profile_json, nostr_pubkey, version, capabilities_json, pricing_json, "
+    "reputation_score, last_seen, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_CONTRACT = (
+    "INSERT INTO marketplace_contracts (contract_id, advisor_did, operator_id, node_id, status, tier, "
+    "scope_json, pricing_json, created_at) VALUES (?, ?, ?, ?, 'proposed', ?, ?, ?, ?)"
+)
+_SQL_SELECT_CONTRACT = "SELECT * FROM marketplace_contracts WHERE contract_id = ?"
+_SQL_INSERT_TRIAL = (
+    "INSERT INTO marketplace_trials (trial_id, contract_id, advisor_did, node_id, scope, "
+    "sequence_number, flat_fee_sats, start_at, end_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# start_trial pre-checks in one round trip: active trials (capped probe),
+# cooldown conflict with another advisor, table row cap, and the number of
+# recent trials for the sequence number.
+_SQL_TRIAL_PRECHECKS = (
+    "SELECT "
+    "(SELECT COUNT(*) FROM (SELECT 1 FROM marketplace_trials "
+    " WHERE node_id = ? AND outcome IS NULL LIMIT ?)) AS active_count, "
+    "(SELECT 1 FROM marketplace_trials mt "
+    " JOIN marketplace_contracts mc ON mc.contract_id = mt.contract_id "
+    " WHERE mt.node_id = ? AND mt.scope = ? AND mt.start_at > ? "
+    " AND mt.advisor_did != ? LIMIT 1) AS cooldown_probe, "
+    "(SELECT 1 FROM marketplace_trials LIMIT 1 OFFSET ?) AS at_row_cap, "
+    "(SELECT COUNT(*) FROM marketplace_trials "
+    " WHERE node_id = ? AND scope = ? AND start_at > ?) AS recent_count"
+)
+_SQL_MARK_CONTRACT_TRIAL = (
+    "UPDATE marketplace_contracts SET status = 'trial', trial_start = ?, trial_end = ? WHERE contract_id = ?"
+)
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("cached marketplace profile is read-only")
+
+
+class _FrozenDict(dict):
+    """dict that refuses mutation; still JSON-serializable and == to dicts."""
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        # copy / deepcopy / pickle yield a plain, mutable dict
+        return (dict, (dict(self),))
+
+
+class _FrozenList(list):
+    """list that refuses mutation; still JSON-serializable and == to lists."""
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        # copy / deepcopy / pickle yield a plain, mutable list
+        return (list, (list(self),))
+
+
+def _freeze(obj: Any) -> Any:
+    """Recursively convert a decoded JSON tree to read-only containers."""
+    if isinstance(obj, dict):
+        return _FrozenDict((k, _freeze(v)) for k, v in obj.items())
+    if isinstance(obj, list):
+        return _FrozenList(_freeze(v) for v in obj)
+    return obj
 
 
 class MarketplaceManager:
@@ -13,6 +150,13 @@ class MarketplaceManager:
     PROFILE_STALE_DAYS = 90
     MAX_ACTIVE_TRIALS = 2
     TRIAL_COOLDOWN_DAYS = 14
+    TRIAL_SEQUENCE_WINDOW_DAYS = 90
+    PROFILE_CLEANUP_BATCH_SIZE = 500
+    PROFILE_REPUBLISH_INTERVAL = 4 * 3600
+
+    _TRIAL_COOLDOWN_SECS = TRIAL_COOLDOWN_DAYS * 86400
+    _TRIAL_SEQUENCE_WINDOW_SECS = TRIAL_SEQUENCE_WINDOW_DAYS * 86400
+    _PROFILE_STALE_SECS = PROFILE_STALE_DAYS * 86400
 
     def __init__(self, database, plugin, nostr_transport, did_credential_mgr,
                  management_schema_registry, cashu_escrow_mgr):
@@ -25,6 +169,11 @@ class MarketplaceManager:
 
         self._last_profile_publish_at = 0
         self._our_profile: Optional[Dict[str, Any]] = None
+        # profile_json / capabilities_json / pricing_json for _our_profile
+        self._our_profile_serialized: Optional[Dict[str, str]] = None
+        # advisor_did -> (profile_json, decoded profile) for discover_advisors
+        self._decoded_profiles: Dict[str, Tuple[str, Any]] = {}
+        self._decoded_lock = threading.Lock()
 
     def _log(self, msg: str, level: str = "info") -> None:
         self.plugin.log(f"cl-hive: marketplace: {msg}", level=level)
@@ -32,40 +181,70 @@ class MarketplaceManager:
     def discover_advisors(self, criteria: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Discover advisors using cached marketplace profiles."""
         criteria = criteria or {}
+        min_reputation = int(criteria.get("min_reputation", 0))
+        specialization = str(criteria.get("specialization", "")).strip()
+        # Filters run in SQLite (JSON1) so non-matching rows are never decoded
         conn = self.db._get_connection()
         rows = conn.execute(
-            "SELECT * FROM marketplace_profiles ORDER BY reputation_score DESC, last_seen DESC LIMIT ?",
-            (self.MAX_CACHED_PROFILES,)
+            "SELECT * FROM marketplace_profiles WHERE reputation_score >= ? "
+            "AND (? = '' OR EXISTS (SELECT 1 FROM json_each(profile_json, '$.specializations') "
+            "WHERE value = ?)) "
+            "ORDER BY reputation_score DESC, last_seen DESC LIMIT ?",
+            (min_reputation, specialization, specialization, self.MAX_CACHED_PROFILES)
         ).fetchall()
         profiles = []
-        min_reputation = int(criteria.get("min_reputation", 0))
-        specialization = str(criteria.get("specialization", "")).strip()
         for row in rows:
             profile = dict(row)
-            if int(profile.get("reputation_score", 0)) < min_reputation:
-                continue
-            payload = json.loads(profile.get("profile_json", "{}") or "{}")
-            if specialization:
-                specs = payload.get("specializations", []) if isinstance(payload, dict) else []
-                if specialization not in specs:
-                    continue
-            profile["profile"] = payload
+            profile["profile"] = self._decode_profile_json(
+                profile["advisor_did"], profile.get("profile_json") or "{}"
+            )
             profiles.append(profile)
         return profiles
 
-    def publish_profile(self, profile: Dict[str, Any]) -> Dict[str, Any]:
-        """Publish our advisor profile and store it in cache."""
+    def _decode_profile_json(self, advisor_did: str, profile_json: str) -> Any:
+        """
+        Decode a cached profile blob, reusing the last parse for this advisor.
+
+        Profiles only change on republish, so repeated discovery calls
+        mostly see the same text. The returned object is shared between
+        callers, so it is frozen: mutating it raises TypeError.
+        """
+        with self._decoded_lock:
+            cached = self._decoded_profiles.get(advisor_did)
+        if cached is not None and cached[0] == profile_json:
+            return cached[1]
+        decoded = _freeze(_loads(profile_json))
+        with self._decoded_lock:
+            if len(self._decoded_profiles) >= self.MAX_CACHED_PROFILES:
+                # Drop the oldest half (dicts preserve insertion order)
+                for key in list(self._decoded_profiles)[:self.MAX_CACHED_PROFILES // 2]:
+                    self._decoded_profiles.pop(key, None)
+            self._decoded_profiles[advisor_did] = (profile_json, decoded)
+        return decoded
+
+    def publish_profile(self, profile: Dict[str, Any],
+                        profile_serialized: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Publish our advisor profile and store it in cache.
+
+        profile_serialized may carry the already-encoded "profile_json",
+        "capabilities_json" and "pricing_json" for this profile; when given,
+        nothing is re-serialized.
+        """
+        if profile_serialized is None:
+            profile_serialized = _encode_profile(profile)
+
         now = int(time.time())
         advisor_did = str(profile.get("advisor_did") or profile.get("did") or "")
         if not advisor_did:
             return {"error": "advisor_did is required"}
 
-        if self.db.count_rows("marketplace_profiles") >= self.db.MAX_MARKETPLACE_PROFILE_ROWS:
+        if self.db.has_at_least_rows("marketplace_profiles", self.db.MAX_MARKETPLACE_PROFILE_ROWS):
             return {"error": "marketplace profile row cap reached"}
 
-        profile_json = json.dumps(profile, sort_keys=True, separators=(",", ":"))
-        capabilities = profile.get("capabilities", {})
-        pricing = profile.get("pricing", {})
+        profile_json = profile_serialized["profile_json"]
+        capabilities_json = profile_serialized["capabilities_json"]
+        pricing_json = profile_serialized["pricing_json"]
         version = str(profile.get("version", "1"))
         nostr_pubkey = None
         if self.nostr_transport:
@@ -73,16 +252,14 @@ class MarketplaceManager:
 
         conn = self.db._get_connection()
         conn.execute(
-            "INSERT OR REPLACE INTO marketplace_profiles "
-            "(advisor_did, profile_json, nostr_pubkey, version, capabilities_json, pricing_json, "
-            "reputation_score, last_seen, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _SQL_INSERT_PROFILE,
             (
                 advisor_did,
                 profile_json,
                 nostr_pubkey,
                 version,
-                json.dumps(capabilities, sort_keys=True, separators=(",", ":")),
-                json.dumps(pricing, sort_keys=True, separators=(",", ":")),
+                capabilities_json,
+                pricing_json,
                 int(profile.get("reputation_score", 0)),
                 now,
                 "nostr" if self.nostr_transport else "local",
@@ -99,6 +276,7 @@ class MarketplaceManager:
             self.db.set_nostr_state("event:last_marketplace_profile_id", event.get("id", ""))
 
         self._our_profile = profile
+        self._our_profile_serialized = profile_serialized
         self._last_profile_publish_at = now
         return {
             "ok": True,
@@ -106,9 +284,15 @@ class MarketplaceManager:
             "nostr_event_id": event.get("id") if event else None,
         }
 
-    def _resolve_advisor_nostr_pubkey(self, advisor_did: str) -> Optional[str]:
+    def set_our_profile(self, profile: Optional[Dict[str, Any]]) -> None:
+        """Replace the local profile used by republish_profile (drops cached encoding)."""
+        self._our_profile = profile
+        self._our_profile_serialized = None
+
+    def _resolve_advisor_nostr_pubkey(self, advisor_did: str, conn=None) -> Optional[str]:
         """Resolve advisor DID to cached Nostr pubkey when available."""
-        conn = self.db._get_connection()
+        if conn is None:
+            conn = self.db._get_connection()
         row = conn.execute(
             "SELECT nostr_pubkey FROM marketplace_profiles WHERE advisor_did = ?",
             (advisor_did,),
@@ -122,43 +306,37 @@ class MarketplaceManager:
                          operator_id: Optional[str] = None) -> Dict[str, Any]:
         """Create a proposed contract and send a DM proposal."""
         now = int(time.time())
-        if self.db.count_rows("marketplace_contracts") >= self.db.MAX_MARKETPLACE_CONTRACT_ROWS:
+        if self.db.has_at_least_rows("marketplace_contracts", self.db.MAX_MARKETPLACE_CONTRACT_ROWS):
             return {"error": "marketplace contract row cap reached"}
 
-        contract_id = str(uuid.uuid4())
+        contract_id = _new_id()
+        scope_json = _dumps(scope) if scope else _EMPTY_JSON
+        pricing_json = _dumps(pricing) if pricing else _EMPTY_JSON
         conn = self.db._get_connection()
         conn.execute(
-            "INSERT INTO marketplace_contracts (contract_id, advisor_did, operator_id, node_id, status, tier, "
-            "scope_json, pricing_json, created_at) VALUES (?, ?, ?, ?, 'proposed', ?, ?, ?, ?)",
+            _SQL_INSERT_CONTRACT,
             (
                 contract_id,
                 advisor_did,
                 operator_id or node_id,
                 node_id,
                 tier or "standard",
-                json.dumps(scope or {}, sort_keys=True, separators=(",", ":")),
-                json.dumps(pricing or {}, sort_keys=True, separators=(",", ":")),
+                scope_json,
+                pricing_json,
                 now,
             ),
         )
 
         dm_event_id = None
         if self.nostr_transport:
-            recipient = self._resolve_advisor_nostr_pubkey(advisor_did) or advisor_did
+            recipient = self._resolve_advisor_nostr_pubkey(advisor_did, conn) or advisor_did
             # Only send DM when recipient resolves to a valid 32-byte hex pubkey.
-            if len(recipient) == 64 and all(c in "0123456789abcdefABCDEF" for c in recipient):
-                dm_payload = {
-                    "type": "contract_proposal",
-                    "contract_id": contract_id,
-                    "advisor_did": advisor_did,
-                    "node_id": node_id,
-                    "tier": tier,
-                    "scope": scope or {},
-                    "pricing": pricing or {},
-                }
+            if _HEX64_RE.match(recipient):
                 dm_event = self.nostr_transport.send_dm(
                     recipient_pubkey=recipient,
-                    plaintext=json.dumps(dm_payload, sort_keys=True, separators=(",", ":")),
+                    plaintext=_encode_contract_proposal(
+                        contract_id, advisor_did, node_id, tier, scope_json, pricing_json,
+                    ),
                 )
                 dm_event_id = dm_event.get("id")
             else:
@@ -172,7 +350,7 @@ class MarketplaceManager:
         """Accept a proposed contract and publish confirmation event."""
         conn = self.db._get_connection()
         row = conn.execute(
-            "SELECT * FROM marketplace_contracts WHERE contract_id = ?",
+            _SQL_SELECT_CONTRACT,
             (contract_id,),
         ).fetchone()
         if not row:
@@ -188,83 +366,69 @@ class MarketplaceManager:
         if self.nostr_transport:
             event = self.nostr_transport.publish({
                 "kind": 38383,
-                "content": json.dumps({"contract_id": contract_id, "status": "active"}, separators=(",", ":")),
+                "content": _dumps({"contract_id": contract_id, "status": "active"}),
                 "tags": [["t", "hive-contract-confirmation"]],
             })
         return {"ok": True, "contract_id": contract_id, "nostr_event_id": event.get("id") if event else None}
 
-    def _active_trial_count(self, node_id: str) -> int:
-        conn = self.db._get_connection()
-        row = conn.execute(
-            "SELECT COUNT(*) as cnt FROM marketplace_trials WHERE node_id = ? AND outcome IS NULL",
-            (node_id,),
-        ).fetchone()
-        return int(row["cnt"]) if row else 0
-
-    def _next_trial_sequence(self, node_id: str, scope: str) -> int:
-        conn = self.db._get_connection()
-        cutoff = int(time.time()) - (90 * 86400)
-        row = conn.execute(
-            "SELECT COUNT(*) as cnt FROM marketplace_trials WHERE node_id = ? AND scope = ? AND start_at > ?",
-            (node_id, scope, cutoff),
-        ).fetchone()
-        return int(row["cnt"] or 0) + 1
-
     def start_trial(self, contract_id: str, duration_days: int = 14,
                     flat_fee_sats: int = 0) -> Dict[str, Any]:
         """Start a contract trial with anti-gaming constraints."""
         conn = self.db._get_connection()
         row = conn.execute(
-            "SELECT * FROM marketplace_contracts WHERE contract_id = ?",
+            _SQL_SELECT_CONTRACT,
             (contract_id,),
         ).fetchone()
         if not row:
             return {"error": "contract not found"}
-        contract = dict(row)
-        node_id = contract["node_id"]
-        scope_obj = json.loads(contract["scope_json"] or "{}")
+        # sqlite3.Row supports column access directly; no dict copy needed
+        node_id = row["node_id"]
+        advisor_did = row["advisor_did"]
+        scope_json = row["scope_json"]
+        scope_obj = _loads(scope_json) if scope_json and scope_json != _EMPTY_JSON else {}
         scope = str(scope_obj.get("scope") or "default")
 
-        if self._active_trial_count(node_id) >= self.MAX_ACTIVE_TRIALS:
-            return {"error": "max active trials reached"}
-
-        cooldown_cutoff = int(time.time()) - (self.TRIAL_COOLDOWN_DAYS * 86400)
-        prev = conn.execute(
-            "SELECT mt.advisor_did FROM marketplace_trials mt "
-            "JOIN marketplace_contracts mc ON mc.contract_id = mt.contract_id "
-            "WHERE mt.node_id = ? AND mt.scope = ? AND mt.start_at > ? "
-            "AND mt.advisor_did != ? LIMIT 1",
-            (node_id, scope, cooldown_cutoff, contract["advisor_did"]),
-        ).fetchone()
-        if prev:
-            return {"error": "trial cooldown active"}
-
-        if self.db.count_rows("marketplace_trials") >= self.db.MAX_MARKETPLACE_TRIAL_ROWS:
-            return {"error": "marketplace trial row cap reached"}
-
+        # Checks and writes share one write transaction so concurrent
+        # starts cannot both pass the active-trial and cooldown checks.
         now = int(time.time())
-        trial_id = str(uuid.uuid4())
-        sequence = self._next_trial_sequence(node_id, scope)
-        end_at = now + max(1, int(duration_days)) * 86400
-        conn.execute(
-            "INSERT INTO marketplace_trials (trial_id, contract_id, advisor_did, node_id, scope, "
-            "sequence_number, flat_fee_sats, start_at, end_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (
-                trial_id,
-                contract_id,
-                contract["advisor_did"],
-                node_id,
-                scope,
-                sequence,
-                max(0, int(flat_fee_sats)),
-                now,
-                end_at,
-            ),
-        )
-        conn.execute(
-            "UPDATE marketplace_contracts SET status = 'trial', trial_start = ?, trial_end = ? WHERE contract_id = ?",
-            (now, end_at, contract_id),
-        )
+        with self.db.transaction() as conn:
+            checks = conn.execute(_SQL_TRIAL_PRECHECKS, (
+                node_id, self.MAX_ACTIVE_TRIALS,
+                node_id, scope, now - self._TRIAL_COOLDOWN_SECS, advisor_did,
+                self.db.MAX_MARKETPLACE_TRIAL_ROWS - 1,
+                node_id, scope, now - self._TRIAL_SEQUENCE_WINDOW_SECS,
+            )).fetchone()
+
+            if int(checks["active_count"] or 0) >= self.MAX_ACTIVE_TRIALS:
+                return {"error": "max active trials reached"}
+
+            if checks["cooldown_probe"]:
+                return {"error": "trial cooldown active"}
+
+            if checks["at_row_cap"]:
+                return {"error": "marketplace trial row cap reached"}
+
+            trial_id = _new_id()
+            sequence = int(checks["recent_count"] or 0) + 1
+            end_at = now + max(1, int(duration_days)) * 86400
+            conn.execute(
+                _SQL_INSERT_TRIAL,
+                (
+                    trial_id,
+                    contract_id,
+                    advisor_did,
+                    node_id,
+                    scope,
+                    sequence,
+                    max(0, int(flat_fee_sats)),
+                    now,
+                    end_at,
+                ),
+            )
+            conn.execute(
+                _SQL_MARK_CONTRACT_TRIAL,
+                (now, end_at, contract_id),
+            )
         return {"ok": True, "trial_id": trial_id, "sequence_number": sequence, "end_at": end_at}
 
     def evaluate_trial(self, contract_id: str, evaluation: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -276,22 +440,23 @@ class MarketplaceManager:
         ).fetchone()
         if not row:
             return {"error": "trial not found"}
-        trial = dict(row)
+        trial_id = row["trial_id"]
         metrics = evaluation or {}
         actions = int(metrics.get("actions_taken", 0))
         uptime = float(metrics.get("uptime_pct", 0))
         revenue_delta = float(metrics.get("revenue_delta", 0))
         outcome = "pass" if actions >= 10 and uptime >= 95 and revenue_delta >= -5 else "fail"
 
-        conn.execute(
-            "UPDATE marketplace_trials SET evaluation_json = ?, outcome = ? WHERE trial_id = ?",
-            (json.dumps(metrics, sort_keys=True, separators=(",", ":")), outcome, trial["trial_id"]),
-        )
-        conn.execute(
-            "UPDATE marketplace_contracts SET status = ? WHERE contract_id = ?",
-            ("active" if outcome == "pass" else "terminated", contract_id),
-        )
-        return {"ok": True, "trial_id": trial["trial_id"], "outcome": outcome}
+        with self.db.transaction() as conn:
+            conn.execute(
+                "UPDATE marketplace_trials SET evaluation_json = ?, outcome = ? WHERE trial_id = ?",
+                (_dumps(metrics) if metrics else _EMPTY_JSON, outcome, trial_id),
+            )
+            conn.execute(
+                "UPDATE marketplace_contracts SET status = ? WHERE contract_id = ?",
+                ("active" if outcome == "pass" else "terminated", contract_id),
+            )
+        return {"ok": True, "trial_id": trial_id, "outcome": outcome}
 
     def terminate_contract(self, contract_id: str, reason: str = "") -> Dict[str, Any]:
         """Terminate an advisor contract."""
@@ -309,37 +474,39 @@ class MarketplaceManager:
     def cleanup_stale_profiles(self) -> int:
         """Expire stale advisor profiles."""
         conn = self.db._get_connection()
-        cutoff = int(time.time()) - (self.PROFILE_STALE_DAYS * 86400)
-        cursor = conn.execute(
-            "DELETE FROM marketplace_profiles WHERE last_seen < ?",
-            (cutoff,),
-        )
-        return int(cursor.rowcount or 0)
+        cutoff = int(time.time()) - self._PROFILE_STALE_SECS
+        # Autocommit connection: each batch is its own short write transaction,
+        # so other marketplace writers can interleave with a large cleanup.
+        total = 0
+        while True:
+            cursor = conn.execute(
+                "DELETE FROM marketplace_profiles WHERE rowid IN ("
+                "SELECT rowid FROM marketplace_profiles WHERE last_seen < ? LIMIT ?)",
+                (cutoff, self.PROFILE_CLEANUP_BATCH_SIZE),
+            )
+            deleted = int(cursor.rowcount or 0)
+            if deleted == 0:
+                break
+            total += deleted
+        return total
 
     def evaluate_expired_trials(self) -> int:
         """Auto-fail un-evaluated expired trials."""
-        conn = self.db._get_connection()
         now = int(time.time())
-        trial_rows = conn.execute(
-            "SELECT trial_id, contract_id FROM marketplace_trials "
-            "WHERE end_at < ? AND outcome IS NULL",
-            (now,),
-        ).fetchall()
-        if not trial_rows:
-            return 0
-
-        conn.execute(
-            "UPDATE marketplace_trials SET outcome = 'fail' WHERE end_at < ? AND outcome IS NULL",
-            (now,),
-        )
-        contract_ids = {row["contract_id"] for row in trial_rows}
-        for contract_id in contract_ids:
+        with self.db.transaction() as conn:
+            # Terminate the contracts first: once the trials are marked 'fail'
+            # the newly-expired set can no longer be told apart from older failures.
             conn.execute(
                 "UPDATE marketplace_contracts SET status = 'terminated' "
-                "WHERE contract_id = ? AND status = 'trial'",
-                (contract_id,),
+                "WHERE status = 'trial' AND contract_id IN ("
+                "SELECT contract_id FROM marketplace_trials WHERE end_at < ? AND outcome IS NULL)",
+                (now,),
             )
-        return len(trial_rows)
+            cursor = conn.execute(
+                "UPDATE marketplace_trials SET outcome = 'fail' WHERE end_at < ? AND outcome IS NULL",
+                (now,),
+            )
+        return int(cursor.rowcount or 0)
 
     def check_contract_renewals(self) -> List[Dict[str, Any]]:
         """List active contracts approaching expiration."""
@@ -347,22 +514,17 @@ class MarketplaceManager:
         now = int(time.time())
         rows = conn.execute(
             "SELECT * FROM marketplace_contracts WHERE status = 'active' AND contract_end IS NOT NULL "
-            "AND contract_end > ?",
-            (now,),
+            "AND contract_end > ? AND contract_end <= ? + COALESCE(notice_days, 7) * 86400 "
+            "ORDER BY contract_end",
+            (now, now),
         ).fetchall()
-        notices = []
-        for row in rows:
-            contract = dict(row)
-            notice_window = int(contract.get("notice_days", 7)) * 86400
-            if int(contract.get("contract_end") or 0) <= now + notice_window:
-                notices.append(contract)
-        return notices
+        return [dict(row) for row in rows]
 
     def republish_profile(self) -> Optional[Dict[str, Any]]:
         """Re-publish local profile every 4 hours."""
         if not self._our_profile:
             return None
         now = int(time.time())
-        if now - self._last_profile_publish_at < (4 * 3600):
+        if now - self._last_profile_publish_at < self.PROFILE_REPUBLISH_INTERVAL:
             return None
-        return self.publish_profile(self._our_profile)
+        return self.publish_profile(self._our_profile, self._our_profile_serialized)
@@ -6,28 +6,96 @@ Supports two modes:
 2. ExternalCommsTransport: Coordinated mode (delegates to cl-hive-comms via RPC)
 """
 
-import base64
+import binascii
+import collections
 import hashlib
+import itertools
 import json
-import queue
-import re
 import secrets
 import threading
 import time
-import uuid
 from typing import Any, Callable, Dict, List, Optional
 
 from modules.bridge import CircuitBreaker, CircuitState
+from modules.json_codec import dumps_utf8
 
 try:
     from coincurve import PrivateKey as CoincurvePrivateKey
 except Exception:  # pragma: no cover - optional dependency
     CoincurvePrivateKey = None
 
-
 NOSTR_KEY_DERIVATION_MSG = "nostr_key_derivation"
 
 
+def _canonical_json(obj: Any) -> bytes:
+    """Compact, non-ASCII-escaping JSON as UTF-8 (the NIP-01 serialization)."""
+    return dumps_utf8(obj)
+
+
+def _is_hex64_lower(value: str) -> bool:
+    """True if value is exactly 64 lowercase hex characters (a 32-byte key)."""
+    if len(value) != 64 or value != value.lower():
+        return False
+    try:
+        # fromhex skips whitespace, so also require all 32 bytes to decode
+        return len(bytes.fromhex(value)) == 32
+    except ValueError:
+        return False
+
+
+def _canonical_dm_digest(pubkey_hex: str, created_at: int, recipient: str,
+                         content_json: bytes) -> bytes:
+    """
+    Raw NIP-01 event id for a kind=4 DM with a single ["p", recipient] tag.
+
+    Both pubkeys must be lowercase hex (nothing to escape); content_json is
+    the already JSON-encoded content string.
+    """
+    h = hashlib.sha256(('[0,"%s",%d,4,[["p","%s"]],' % (pubkey_hex, created_at, recipient)).encode("ascii"))
+    h.update(content_json)
+    h.update(b"]")
+    return h.digest()
+
+
+def _xor_with_key(data: bytes, key: bytes) -> bytes:
+    """XOR data with a repeating key as a single big-int operation."""
+    if not data:
+        return b""
+    reps, rem = divmod(len(data), len(key))
+    stream = key * reps + key[:rem]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(stream, "big")).to_bytes(len(data), "big")
+
+
+class _LazyEnvelope(dict):
+    """
+    DM envelope whose "plaintext" is built on demand as decode(source).
+
+    Many handlers never read "plaintext" (injected packets carry the parsed
+    "payload"), so the decode/encode only runs, once, when one asks for it.
+    """
+
+    def __init__(self, data: Dict[str, Any], decode: Callable[[Any], str], source: Any):
+        super().__init__(data)
+        self.pop("plaintext", None)
+        self._decode = decode
+        self._source = source
+
+    def __missing__(self, key: str) -> Any:
+        if key != "plaintext":
+            raise KeyError(key)
+        plaintext = self._decode(self._source)
+        self["plaintext"] = plaintext
+        return plaintext
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "plaintext":
+            return self["plaintext"]
+        return super().get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key == "plaintext" or super().__contains__(key)
+
+
 class TransportInterface:
     """Abstract base class for Nostr transport."""
     
@@ -65,41 +133,54 @@ class TransportInterface:
 class ExternalCommsTransport(TransportInterface):
     """Delegates transport to cl-hive-comms plugin via RPC with CircuitBreaker."""
 
-    def __init__(self, plugin):
+    QUEUE_MAX_ITEMS = 2000
+
+    def __init__(self, plugin, queue_max_items: Optional[int] = None):
         self.plugin = plugin
+        if queue_max_items:
+            self.QUEUE_MAX_ITEMS = int(queue_max_items)
         self._identity_cache = {}
+        # Serializes the identity RPC; separate from _lock so a slow RPC
+        # doesn't stall inbound queueing.
+        self._identity_lock = threading.Lock()
         self._dm_callbacks: List[Callable[[Dict[str, Any]], None]] = []
         self._lock = threading.Lock()
-        # Inbound queue for messages injected via hive-inject-packet
-        self._inbound_queue: queue.Queue = queue.Queue(maxsize=2000)
+        # Inbound queue for messages injected via hive-inject-packet (guarded by _lock)
+        self._inbound_queue: collections.deque = collections.deque()
+        self._inbound_drops = 0
+        self._inbound_high_water = 0
         # Circuit breaker for comms RPC calls
         self._circuit = CircuitBreaker(name="external-comms", max_failures=3, reset_timeout=60)
 
     def get_identity(self) -> Dict[str, str]:
-        if not self._identity_cache:
-            if not self._circuit.is_available():
-                self.plugin.log("cl-hive: comms circuit open, using cached/empty identity", level="warn")
-                return {"pubkey": "", "privkey": ""}
-            try:
-                res = self.plugin.rpc.call("hive-client-identity", {"action": "get"})
-                if not isinstance(res, dict):
-                    self._circuit.record_failure()
-                    self.plugin.log("cl-hive: comms identity returned non-dict", level="warn")
+        if self._identity_cache:
+            return self._identity_cache
+        with self._identity_lock:
+            # Another thread may have filled the cache while we waited
+            if not self._identity_cache:
+                if not self._circuit.is_available():
+                    self.plugin.log("cl-hive: comms circuit open, using cached/empty identity", level="warn")
                     return {"pubkey": "", "privkey": ""}
-                pubkey = str(res.get("pubkey") or "")
-                if pubkey and not re.fullmatch(r"[0-9a-f]{64}", pubkey):
+                try:
+                    res = self.plugin.rpc.call("hive-client-identity", {"action": "get"})
+                    if not isinstance(res, dict):
+                        self._circuit.record_failure()
+                        self.plugin.log("cl-hive: comms identity returned non-dict", level="warn")
+                        return {"pubkey": "", "privkey": ""}
+                    pubkey = str(res.get("pubkey") or "")
+                    if pubkey and not _is_hex64_lower(pubkey):
+                        self._circuit.record_failure()
+                        self.plugin.log(f"cl-hive: comms returned invalid pubkey format", level="warn")
+                        return {"pubkey": "", "privkey": ""}
+                    self._circuit.record_success()
+                    self._identity_cache = {
+                        "pubkey": pubkey,
+                        "privkey": "",  # Remote mode doesn't expose privkey
+                    }
+                except Exception as e:
                     self._circuit.record_failure()
-                    self.plugin.log(f"cl-hive: comms returned invalid pubkey format", level="warn")
+                    self.plugin.log(f"cl-hive: failed to get identity from comms: {e}", level="warn")
                     return {"pubkey": "", "privkey": ""}
-                self._circuit.record_success()
-                self._identity_cache = {
-                    "pubkey": pubkey,
-                    "privkey": "",  # Remote mode doesn't expose privkey
-                }
-            except Exception as e:
-                self._circuit.record_failure()
-                self.plugin.log(f"cl-hive: failed to get identity from comms: {e}", level="warn")
-                return {"pubkey": "", "privkey": ""}
         return self._identity_cache
 
     def start(self) -> bool:
@@ -155,45 +236,57 @@ class ExternalCommsTransport(TransportInterface):
         if not isinstance(payload, dict):
             self.plugin.log("cl-hive: inject_packet called with non-dict payload", level="warn")
             return False
-        try:
-            self._inbound_queue.put_nowait(payload)
-            return True
-        except queue.Full:
-            self.plugin.log("cl-hive: external transport inbound queue full, dropping packet", level="warn")
-            return False
+        with self._lock:
+            depth = len(self._inbound_queue)
+            if depth < self.QUEUE_MAX_ITEMS:
+                self._inbound_queue.append(payload)
+                if depth >= self._inbound_high_water:
+                    self._inbound_high_water = depth + 1
+                return True
+            self._inbound_drops += 1
+        self.plugin.log("cl-hive: external transport inbound queue full, dropping packet", level="warn")
+        return False
 
     def process_inbound(self, max_events: int = 100) -> int:
         """Process queue populated by hive-inject-packet."""
-        processed = 0
-        while processed < max_events:
-            try:
-                payload = self._inbound_queue.get_nowait()
-            except queue.Empty:
-                break
-
-            processed += 1
-            # Re-serialize payload to plaintext for compatibility with handlers
-            # that expect to parse JSON from the plaintext field
-            envelope = {
-                "plaintext": json.dumps(payload),
-                "pubkey": payload.get("sender") or "",
-                "payload": payload,
-            }
+        with self._lock:
+            batch = [self._inbound_queue.popleft()
+                     for _ in range(min(max_events, len(self._inbound_queue)))]
+            dm_callbacks = tuple(self._dm_callbacks)
+
+        if not dm_callbacks:
+            # Nobody to deliver to: drop the batch without building envelopes
+            return len(batch)
+
+        for payload in batch:
+            # "plaintext" (the payload re-serialized as JSON) is produced lazily
+            # for handlers that still parse it; most only read "payload".
+            envelope = _LazyEnvelope(
+                {"pubkey": payload.get("sender") or "", "payload": payload},
+                json.dumps,
+                payload,
+            )
 
-            with self._lock:
-                dm_callbacks = list(self._dm_callbacks)
             for cb in dm_callbacks:
                 try:
                     cb(envelope)
                 except Exception as exc:
                     self.plugin.log(f"cl-hive: DM callback error: {exc}", level="warn")
-        return processed
+        return len(batch)
 
     def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            inbound_size = len(self._inbound_queue)
+            inbound_drops = self._inbound_drops
+            inbound_high_water = self._inbound_high_water
         return {
             "mode": "external",
             "plugin": "cl-hive-comms",
             "circuit_state": self._circuit.state.value,
+            "queue_max_items": self.QUEUE_MAX_ITEMS,
+            "inbound_queue_size": inbound_size,
+            "inbound_drops": inbound_drops,
+            "inbound_high_water": inbound_high_water,
         }
 
 
@@ -206,23 +299,41 @@ class InternalNostrTransport(TransportInterface):
     ]
     MAX_RELAY_CONNECTIONS = 8
     QUEUE_MAX_ITEMS = 2000
+    MAX_SIGNATURE_CACHE = 4096
+    OUTBOUND_BATCH_SIZE = 256
+    STATE_FLUSH_INTERVAL = 1.0
 
     def __init__(self, plugin, database, privkey_hex: Optional[str] = None,
-                 relays: Optional[List[str]] = None):
+                 relays: Optional[List[str]] = None,
+                 queue_max_items: Optional[int] = None):
         self.plugin = plugin
         self.db = database
+        if queue_max_items:
+            self.QUEUE_MAX_ITEMS = int(queue_max_items)
 
         relay_list = relays or self.DEFAULT_RELAYS
         # Preserve order while deduplicating.
         self.relays = list(dict.fromkeys([r for r in relay_list if r]))[:self.MAX_RELAY_CONNECTIONS]
 
-        self._outbound_queue: queue.Queue = queue.Queue(maxsize=self.QUEUE_MAX_ITEMS)
-        self._inbound_queue: queue.Queue = queue.Queue(maxsize=self.QUEUE_MAX_ITEMS)
+        # Both queues are guarded by _lock and drained in batches; the
+        # publisher thread sleeps on _outbound_ready between batches.
+        self._outbound_queue: collections.deque = collections.deque()
+        self._outbound_ready = threading.Event()
+        self._inbound_queue: collections.deque = collections.deque()
+        self._inbound_drops = 0
+        self._inbound_high_water = 0
+        self._outbound_drops = 0
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
 
         self._lock = threading.Lock()
         self._subscriptions: Dict[str, Dict[str, Any]] = {}
+        # (by_kind, by_author, unindexed) over _subscriptions; rebuilt on
+        # subscribe/unsubscribe so process_inbound only reads a snapshot
+        self._sub_index: tuple = ({}, {}, [])
+        # Local subscription ids: random per-instance prefix + counter
+        self._sub_prefix = secrets.token_hex(4)
+        self._sub_counter = itertools.count(1)
         self._dm_callbacks: List[Callable[[Dict[str, Any]], None]] = []
 
         self._relay_status: Dict[str, Dict[str, Any]] = {
@@ -235,9 +346,21 @@ class InternalNostrTransport(TransportInterface):
             for relay in self.relays
         }
 
+        # event id -> signature, so re-publishing an identical event skips signing
+        self._signature_cache: Dict[str, str] = {}
+
         self._storage_key: Optional[bytes] = None
+        # Storage key repeated out to the longest value seen so far
+        self._tiled_key = b""
         self._privkey_hex = ""
+        self._privkey_bytes = b""
+        # _privkey_hex as UTF-8, the key material of the SHA-256 fallbacks
+        self._privkey_hex_utf8 = b""
         self._pubkey_hex = ""
+        # '[0,"<our pubkey>",' -- the constant head of our events' id serialization
+        self._id_prefix = b""
+        # coincurve key object for _privkey_hex, built once (None without coincurve)
+        self._privkey_obj = None
 
         self._derive_storage_key()
         self._load_or_create_identity(privkey_hex)
@@ -255,26 +378,32 @@ class InternalNostrTransport(TransportInterface):
             sig = result.get("zbase", "") if isinstance(result, dict) else ""
             if sig:
                 self._storage_key = hashlib.sha256(sig.encode("utf-8")).digest()
+                self._tiled_key = b""
         except Exception as e:
             self._log(f"storage key derivation failed (non-fatal): {e}", level="warn")
 
+    def _key_stream(self, length: int) -> bytes:
+        """Storage key tiled to at least length bytes (cached and grown)."""
+        if len(self._tiled_key) < length:
+            key = self._storage_key or b""
+            self._tiled_key = key * (length // len(key) + 1)
+        return self._tiled_key
+
     def _encrypt_value(self, value: str) -> str:
         """XOR-encrypt UTF-8 text if a storage key is available."""
         if not self._storage_key:
             return value
         raw = value.encode("utf-8")
-        key = self._storage_key
-        encrypted = bytes(b ^ key[i % len(key)] for i, b in enumerate(raw))
-        return base64.b64encode(encrypted).decode("ascii")
+        encrypted = _xor_with_key(raw, self._key_stream(len(raw)))
+        return binascii.b2a_base64(encrypted, newline=False).decode("ascii")
 
     def _decrypt_value(self, value: str) -> str:
         """XOR-decrypt text if a storage key is available."""
         if not self._storage_key:
             return value
         try:
-            encrypted = base64.b64decode(value.encode("ascii"))
-            key = self._storage_key
-            raw = bytes(b ^ key[i % len(key)] for i, b in enumerate(encrypted))
+            encrypted = binascii.a2b_base64(value)
+            raw = _xor_with_key(encrypted, self._key_stream(len(encrypted)))
             return raw.decode("utf-8")
         except Exception:
             return value
@@ -291,24 +420,38 @@ class InternalNostrTransport(TransportInterface):
             privkey_hex = secrets.token_hex(32)
 
         self._privkey_hex = privkey_hex.lower()
-        self._pubkey_hex = self._derive_pubkey(self._privkey_hex)
+        self._privkey_hex_utf8 = self._privkey_hex.encode("utf-8")
+        try:
+            self._privkey_bytes = bytes.fromhex(self._privkey_hex)
+        except ValueError:
+            self._privkey_bytes = b""
+        self._privkey_obj = None
+        if CoincurvePrivateKey and self._privkey_bytes:
+            try:
+                self._privkey_obj = CoincurvePrivateKey(self._privkey_bytes)
+            except Exception:
+                self._privkey_obj = None
+        self._pubkey_hex = self._derive_pubkey()
+        self._id_prefix = b'[0,"' + self._pubkey_hex.encode("ascii") + b'",'
 
         if self.db:
-            self.db.set_nostr_state("config:privkey", self._encrypt_value(self._privkey_hex))
-            self.db.set_nostr_state("config:pubkey", self._pubkey_hex)
-            self.db.set_nostr_state("config:relays", json.dumps(self.relays, separators=(",", ":")))
+            self.db.set_nostr_states({
+                "config:privkey": self._encrypt_value(self._privkey_hex),
+                "config:pubkey": self._pubkey_hex,
+                "config:relays": json.dumps(self.relays, separators=(",", ":")),
+            })
 
-    def _derive_pubkey(self, privkey_hex: str) -> str:
-        """Derive a deterministic 32-byte pubkey hex from private key."""
-        try:
-            secret = bytes.fromhex(privkey_hex)
-            if CoincurvePrivateKey:
-                priv = CoincurvePrivateKey(secret)
-                uncompressed = priv.public_key.format(compressed=False)
+    def _derive_pubkey(self) -> str:
+        """Derive a deterministic 32-byte pubkey hex from the loaded private key."""
+        if self._privkey_obj is not None:
+            try:
+                uncompressed = self._privkey_obj.public_key.format(compressed=False)
                 return uncompressed[1:33].hex()
-            return hashlib.sha256(secret).hexdigest()
-        except Exception:
-            return hashlib.sha256(privkey_hex.encode("utf-8")).hexdigest()
+            except Exception:
+                pass
+        elif self._privkey_bytes and not CoincurvePrivateKey:
+            return hashlib.sha256(self._privkey_bytes).hexdigest()
+        return hashlib.sha256(self._privkey_hex_utf8).hexdigest()
 
     def get_identity(self) -> Dict[str, str]:
         return {
@@ -342,51 +485,105 @@ class InternalNostrTransport(TransportInterface):
                 relay["last_seen"] = now
                 relay["last_error"] = ""
 
+        # Last-published state is persisted at most once per
+        # STATE_FLUSH_INTERVAL, and on idle/stop, rather than per batch.
+        pending: Optional[tuple] = None
+        last_flush = time.monotonic() - self.STATE_FLUSH_INTERVAL
+
         while not self._stop_event.is_set():
-            try:
-                event = self._outbound_queue.get(timeout=0.2)
-            except queue.Empty:
+            if not self._outbound_ready.wait(timeout=0.2):
+                if pending and time.monotonic() - last_flush >= self.STATE_FLUSH_INTERVAL:
+                    self._flush_publish_state(*pending)
+                    pending = None
+                    last_flush = time.monotonic()
                 continue
+            self._outbound_ready.clear()
 
+            # Take up to a batch so relay stats and the last-published
+            # state are updated once per batch.
             now = int(time.time())
             with self._lock:
+                count = min(self.OUTBOUND_BATCH_SIZE, len(self._outbound_queue))
+                if not count:
+                    continue
+                for _ in range(count - 1):
+                    self._outbound_queue.popleft()
+                event = self._outbound_queue.popleft()
+                if self._outbound_queue:
+                    self._outbound_ready.set()
                 for relay in self._relay_status.values():
                     relay["connected"] = True
                     relay["last_seen"] = now
-                    relay["published_count"] += 1
+                    relay["published_count"] += count
+
+            pending = (str(event.get("id", "")), now)
+            if time.monotonic() - last_flush >= self.STATE_FLUSH_INTERVAL:
+                self._flush_publish_state(*pending)
+                pending = None
+                last_flush = time.monotonic()
 
-            if self.db:
-                event_id = str(event.get("id", ""))
-                self.db.set_nostr_state("event:last_published_id", event_id)
-                self.db.set_nostr_state("event:last_published_at", str(now))
+        if pending:
+            self._flush_publish_state(*pending)
 
         with self._lock:
             for relay in self._relay_status.values():
                 relay["connected"] = False
 
+    def _flush_publish_state(self, event_id: str, published_at: int) -> None:
+        if self.db:
+            self.db.set_nostr_states({
+                "event:last_published_id": event_id,
+                "event:last_published_at": str(published_at),
+            })
+
     def _compute_event_id(self, event: Dict[str, Any]) -> str:
-        serial = [
-            0,
-            event.get("pubkey", ""),
+        return self._compute_event_digest(event).hex()
+
+    def _compute_event_digest(self, event: Dict[str, Any]) -> bytes:
+        """Raw 32-byte event id; hex only at the event/API boundary."""
+        tags = event.get("tags", [])
+        if (event.get("kind") == 4 and len(tags) == 1 and len(tags[0]) == 2
+                and tags[0][0] == "p" and isinstance(tags[0][1], str)
+                and isinstance(event.get("content", ""), str)):
+            pubkey = event.get("pubkey", "")
+            recipient = tags[0][1]
+            # Our own pubkey is already known to be lowercase hex
+            if (isinstance(pubkey, str)
+                    and (pubkey == self._pubkey_hex or _is_hex64_lower(pubkey))
+                    and _is_hex64_lower(recipient)):
+                return _canonical_dm_digest(
+                    pubkey,
+                    int(event.get("created_at", int(time.time()))),
+                    recipient,
+                    _canonical_json(event.get("content", "")),
+                )
+
+        pubkey = event.get("pubkey", "")
+        tail = [
             int(event.get("created_at", int(time.time()))),
             int(event.get("kind", 0)),
             event.get("tags", []),
             event.get("content", ""),
         ]
-        payload = json.dumps(serial, separators=(",", ":"), ensure_ascii=False)
-        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
-
-    def _sign_event(self, event: Dict[str, Any]) -> str:
+        if pubkey == self._pubkey_hex:
+            # Compact JSON of [a, b, ...] is "[" + "a,b,...]": continue the
+            # cached prefix with the tail array minus its opening bracket.
+            h = hashlib.sha256(self._id_prefix)
+            h.update(memoryview(_canonical_json(tail))[1:])
+            return h.digest()
+        return hashlib.sha256(_canonical_json([0, pubkey] + tail)).digest()
+
+    def _sign_event(self, event: Dict[str, Any], digest: Optional[bytes] = None) -> str:
         event_id = str(event.get("id", ""))
-        if len(event_id) == 64 and CoincurvePrivateKey:
+        if len(event_id) == 64 and self._privkey_obj is not None:
             try:
-                secret = bytes.fromhex(self._privkey_hex)
-                priv = CoincurvePrivateKey(secret)
-                sig = priv.sign_schnorr(bytes.fromhex(event_id))
+                sig = self._privkey_obj.sign_schnorr(digest or bytes.fromhex(event_id))
                 return sig.hex()
             except Exception:
                 pass
-        return hashlib.sha256((event_id + self._privkey_hex).encode("utf-8")).hexdigest()
+        h = hashlib.sha256(event_id.encode("utf-8"))
+        h.update(self._privkey_hex_utf8)
+        return h.hexdigest()
 
     def publish(self, event: Dict[str, Any]) -> Dict[str, Any]:
         if not isinstance(event, dict):
@@ -399,20 +596,39 @@ class InternalNostrTransport(TransportInterface):
         canonical.setdefault("tags", [])
         canonical.setdefault("content", "")
 
-        canonical["id"] = self._compute_event_id(canonical)
-        canonical["sig"] = self._sign_event(canonical)
+        digest = self._compute_event_digest(canonical)
+        canonical["id"] = digest.hex()
+        # The id commits to pubkey/created_at/kind/tags/content, so a cached
+        # signature for the same id is valid for this event as well.
+        with self._lock:
+            sig = self._signature_cache.get(canonical["id"])
+        if sig is None:
+            sig = self._sign_event(canonical, digest)
+            with self._lock:
+                if len(self._signature_cache) >= self.MAX_SIGNATURE_CACHE:
+                    # Drop the oldest half (dicts preserve insertion order)
+                    for key in list(self._signature_cache)[:self.MAX_SIGNATURE_CACHE // 2]:
+                        del self._signature_cache[key]
+                self._signature_cache[canonical["id"]] = sig
+        canonical["sig"] = sig
 
-        try:
-            self._outbound_queue.put_nowait(canonical)
-        except queue.Full:
+        with self._lock:
+            queued = len(self._outbound_queue) < self.QUEUE_MAX_ITEMS
+            if queued:
+                self._outbound_queue.append(canonical)
+            else:
+                self._outbound_drops += 1
+        if not queued:
             self._log("outbound queue full, dropping event", level="warn")
             raise RuntimeError("nostr outbound queue full")
+        self._outbound_ready.set()
 
         return canonical
 
     def _encode_dm(self, plaintext: str) -> str:
-        encoded = base64.b64encode(plaintext.encode("utf-8")).decode("ascii")
-        return f"b64:{encoded}"
+        # Prefix and payload in one bytes buffer, decoded to str once;
+        # binascii directly skips base64's argument normalization
+        return (b"b64:" + binascii.b2a_base64(plaintext.encode("utf-8"), newline=False)).decode("ascii")
 
     def _decode_dm(self, content: str) -> str:
         if not isinstance(content, str):
@@ -420,7 +636,7 @@ class InternalNostrTransport(TransportInterface):
         if not content.startswith("b64:"):
             return content
         try:
-            return base64.b64decode(content[4:].encode("ascii")).decode("utf-8")
+            return binascii.a2b_base64(content[4:]).decode("utf-8")
         except Exception:
             return ""
 
@@ -440,90 +656,154 @@ class InternalNostrTransport(TransportInterface):
 
     def subscribe(self, filters: Dict[str, Any],
                   callback: Callable[[Dict[str, Any]], None]) -> str:
-        sub_id = str(uuid.uuid4())
+        match = self._compile_filters(filters or {})
+        sub_id = f"{self._sub_prefix}-{next(self._sub_counter)}"
         with self._lock:
             self._subscriptions[sub_id] = {
                 "filters": filters or {},
+                "match": match,
                 "callback": callback,
             }
+            self._rebuild_sub_index()
         return sub_id
 
     def unsubscribe(self, sub_id: str) -> bool:
         with self._lock:
-            return self._subscriptions.pop(sub_id, None) is not None
+            removed = self._subscriptions.pop(sub_id, None) is not None
+            if removed:
+                self._rebuild_sub_index()
+            return removed
+
+    def _rebuild_sub_index(self) -> None:
+        """
+        Index subscriptions by filter kind (else author); caller holds _lock.
+
+        Entries are (seq, sub) so candidates from several buckets can be
+        dispatched in subscription order.
+        """
+        by_kind: Dict[Any, List[tuple]] = {}
+        by_author: Dict[Any, List[tuple]] = {}
+        unindexed: List[tuple] = []
+        for seq, sub in enumerate(self._subscriptions.values()):
+            entry = (seq, sub)
+            filters = sub["filters"]
+            for field, index in (("kinds", by_kind), ("authors", by_author)):
+                try:
+                    keys = frozenset(filters.get(field) or ())
+                except TypeError:
+                    continue
+                if keys:
+                    for key in keys:
+                        index.setdefault(key, []).append(entry)
+                    break
+            else:
+                unindexed.append(entry)
+        self._sub_index = (by_kind, by_author, unindexed)
 
     def inject_event(self, event: Dict[str, Any]) -> None:
-        try:
-            self._inbound_queue.put_nowait(event)
-        except queue.Full:
-            self._log("inbound queue full, dropping event", level="warn")
-
-    def _matches_filters(self, event: Dict[str, Any], filters: Dict[str, Any]) -> bool:
-        if not filters:
-            return True
-
-        kinds = filters.get("kinds")
-        if kinds and event.get("kind") not in kinds:
-            return False
-
-        authors = filters.get("authors")
-        if authors and event.get("pubkey") not in authors:
-            return False
-
-        ids = filters.get("ids")
-        if ids:
-            event_id = str(event.get("id", ""))
-            if not any(event_id.startswith(str(prefix)) for prefix in ids):
+        with self._lock:
+            depth = len(self._inbound_queue)
+            if depth < self.QUEUE_MAX_ITEMS:
+                self._inbound_queue.append(event)
+                if depth >= self._inbound_high_water:
+                    self._inbound_high_water = depth + 1
+                return
+            self._inbound_drops += 1
+        self._log("inbound queue full, dropping event", level="warn")
+
+    @staticmethod
+    def _compile_filters(filters: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Build a matcher for a NIP-01 style filter dict.
+
+        Done once at subscribe time: only the fields present are checked,
+        kinds/authors become sets and id prefixes a tuple for startswith.
+        """
+        def as_members(values: Any) -> Any:
+            try:
+                return frozenset(values)
+            except TypeError:
+                return tuple(values)
+
+        kinds = as_members(filters.get("kinds") or ())
+        authors = as_members(filters.get("authors") or ())
+        id_prefixes = tuple(str(prefix) for prefix in filters.get("ids") or ())
+        since = int(filters["since"]) if filters.get("since") else None
+        until = int(filters["until"]) if filters.get("until") else None
+
+        if not (id_prefixes or since is not None or until is not None):
+            # The common shapes: empty, kinds-only or authors-only
+            if not (kinds or authors):
+                return lambda event: True
+            if not authors:
+                return lambda event: event.get("kind") in kinds
+            if not kinds:
+                return lambda event: event.get("pubkey") in authors
+
+        def match(event: Dict[str, Any]) -> bool:
+            if kinds and event.get("kind") not in kinds:
                 return False
+            if authors and event.get("pubkey") not in authors:
+                return False
+            if id_prefixes and not str(event.get("id", "")).startswith(id_prefixes):
+                return False
+            if since is not None or until is not None:
+                created_at = int(event.get("created_at", 0))
+                if since is not None and created_at < since:
+                    return False
+                if until is not None and created_at > until:
+                    return False
+            return True
 
-        since = filters.get("since")
-        if since and int(event.get("created_at", 0)) < int(since):
-            return False
-
-        until = filters.get("until")
-        if until and int(event.get("created_at", 0)) > int(until):
-            return False
-
-        return True
+        return match
 
     def process_inbound(self, max_events: int = 100) -> int:
-        processed = 0
-        while processed < max_events:
-            try:
-                event = self._inbound_queue.get_nowait()
-            except queue.Empty:
-                break
+        # Snapshot callbacks once per batch; subscribers added mid-batch
+        # see events from the next batch on.
+        with self._lock:
+            batch = [self._inbound_queue.popleft()
+                     for _ in range(min(max_events, len(self._inbound_queue)))]
+            dm_callbacks = tuple(self._dm_callbacks)
+            by_kind, by_author, unindexed = self._sub_index
 
-            processed += 1
+        for event in batch:
             event_kind = int(event.get("kind", 0))
 
-            if event_kind == 4:
-                envelope = dict(event)
-                envelope["plaintext"] = self._decode_dm(str(event.get("content", "")))
-                with self._lock:
-                    dm_callbacks = list(self._dm_callbacks)
+            if event_kind == 4 and dm_callbacks:
+                # Copy so DM handlers can't mutate what subscribers receive
+                envelope = _LazyEnvelope(event, self._decode_dm, str(event.get("content", "")))
                 for cb in dm_callbacks:
                     try:
                         cb(envelope)
                     except Exception as e:
                         self._log(f"dm callback error: {e}", level="warn")
 
-            with self._lock:
-                subscriptions = list(self._subscriptions.values())
-            for sub in subscriptions:
-                if self._matches_filters(event, sub.get("filters", {})):
+            try:
+                candidates = (by_kind.get(event.get("kind"), [])
+                              + by_author.get(event.get("pubkey"), []) + unindexed)
+            except TypeError:  # unhashable kind/pubkey: only unindexed subs can match
+                candidates = unindexed
+            if len(candidates) > 1:
+                candidates = sorted(candidates, key=lambda entry: entry[0])
+            for _, sub in candidates:
+                if sub["match"](event):
                     try:
                         sub["callback"](event)
                     except Exception as e:
                         self._log(f"subscription callback error: {e}", level="warn")
 
-        return processed
+        return len(batch)
 
     def get_status(self) -> Dict[str, Any]:
         with self._lock:
             relays = {k: dict(v) for k, v in self._relay_status.items()}
             sub_count = len(self._subscriptions)
             dm_cb_count = len(self._dm_callbacks)
+            inbound_size = len(self._inbound_queue)
+            inbound_drops = self._inbound_drops
+            inbound_high_water = self._inbound_high_water
+            outbound_size = len(self._outbound_queue)
+            outbound_drops = self._outbound_drops
 
         return {
             "mode": "internal",
@@ -531,8 +811,12 @@ class InternalNostrTransport(TransportInterface):
             "pubkey": self._pubkey_hex,
             "relay_count": len(self.relays),
             "relays": relays,
-            "outbound_queue_size": self._outbound_queue.qsize(),
-            "inbound_queue_size": self._inbound_queue.qsize(),
+            "queue_max_items": self.QUEUE_MAX_ITEMS,
+            "outbound_queue_size": outbound_size,
+            "outbound_drops": outbound_drops,
+            "inbound_queue_size": inbound_size,
+            "inbound_drops": inbound_drops,
+            "inbound_high_water": inbound_high_water,
             "subscription_count": sub_count,
             "dm_callback_count": dm_cb_count,
         }
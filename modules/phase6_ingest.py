@@ -5,11 +5,18 @@ These helpers normalize payloads forwarded from cl-hive-comms into
 Hive protocol tuples that cl-hive can dispatch through existing handlers.
 """
 
-import json
+from functools import lru_cache
 from typing import Any, Dict, Optional, Tuple
 
+from modules.json_codec import loads as _loads
 from modules.protocol import HiveMessageType, deserialize
 
+# Deletes every character bytes.fromhex() accepts; anything left means "not hex"
+_HEX_CHARS_TABLE = str.maketrans("", "", "0123456789abcdefABCDEF \t\n\r\x0b\x0c")
+
+# Closed set of wire type ids; ints resolve with one dict lookup
+_TYPE_BY_VALUE: Dict[int, HiveMessageType] = {int(m): m for m in HiveMessageType}
+
 
 def coerce_hive_message_type(value: Any) -> Optional[HiveMessageType]:
     """Best-effort conversion from mixed type identifiers to HiveMessageType."""
@@ -17,92 +24,119 @@ def coerce_hive_message_type(value: Any) -> Optional[HiveMessageType]:
         return value
 
     if isinstance(value, int):
-        try:
-            return HiveMessageType(value)
-        except Exception:
-            return None
+        return _TYPE_BY_VALUE.get(value)
 
     if isinstance(value, str):
-        raw = value.strip()
-        if not raw:
-            return None
-
-        try:
-            return HiveMessageType(int(raw))
-        except Exception:
-            pass
-
-        # Accept names like "gossip" or "HiveMessageType.GOSSIP"
-        name = raw.split(".")[-1].upper()
-        try:
-            return HiveMessageType[name]
-        except Exception:
-            return None
+        return _coerce_message_type_str(value)
 
     return None
 
 
-def parse_injected_hive_packet(
-    packet: Dict[str, Any],
-) -> Tuple[str, Optional[HiveMessageType], Optional[Dict[str, Any]]]:
-    """
-    Parse an injected packet from comms into (peer_id, msg_type, msg_payload).
+@lru_cache(maxsize=256)
+def _coerce_message_type_str(value: str) -> Optional[HiveMessageType]:
+    raw = value.strip()
+    if not raw:
+        return None
 
-    Supported forms:
-    1) {"type": <int|name>, "version": <int>, "payload": {...}, "sender": "..."}
-    2) {"msg_type": <int|name>, "msg_payload": {...}, "sender": "..."}
-    3) {"raw_plaintext": "<hex or json envelope>", "sender": "..."}
-    """
-    if not isinstance(packet, dict):
-        return "", None, None
+    try:
+        return _TYPE_BY_VALUE.get(int(raw))
+    except ValueError:
+        pass
+
+    # Accept names like "gossip" or "HiveMessageType.GOSSIP"
+    name = raw.split(".")[-1].upper()
+    try:
+        return HiveMessageType[name]
+    except KeyError:
+        return None
 
-    peer_id = str(packet.get("sender") or packet.get("peer_id") or packet.get("pubkey") or "")
+
+def _parse_structured(
+    packet: Dict[str, Any],
+) -> Tuple[str, Optional[HiveMessageType], Optional[Dict[str, Any]]]:
+    """Forms 1) and 2) of parse_injected_hive_packet(); packet must be a dict."""
+    get = packet.get
+    peer_id = str(get("sender") or get("peer_id") or get("pubkey") or "")
 
     # Canonical envelope from protocol.serialize() JSON form
-    if "type" in packet and isinstance(packet.get("payload"), dict):
-        msg_type = coerce_hive_message_type(packet.get("type"))
+    payload = get("payload")
+    if "type" in packet and isinstance(payload, dict):
+        msg_type = coerce_hive_message_type(get("type"))
         if msg_type is not None:
-            msg_payload = dict(packet.get("payload") or {})
-            version = packet.get("version")
+            version = get("version")
             if isinstance(version, int):
-                msg_payload["_envelope_version"] = version
-            return peer_id, msg_type, msg_payload
+                payload = dict(payload)
+                payload["_envelope_version"] = version
+            return peer_id, msg_type, payload
 
     # Explicit aliases
     msg_type_raw = (
-        packet.get("msg_type")
-        or packet.get("message_type")
-        or packet.get("hive_message_type")
+        get("msg_type")
+        or get("message_type")
+        or get("hive_message_type")
     )
-    msg_payload_raw = packet.get("msg_payload")
+    msg_payload_raw = get("msg_payload")
     if msg_payload_raw is None:
-        msg_payload_raw = packet.get("message_payload")
-    if msg_payload_raw is None and isinstance(packet.get("payload"), dict):
-        msg_payload_raw = packet.get("payload")
+        msg_payload_raw = get("message_payload")
+    if msg_payload_raw is None and isinstance(payload, dict):
+        msg_payload_raw = payload
 
     msg_type = coerce_hive_message_type(msg_type_raw)
     if msg_type is not None and isinstance(msg_payload_raw, dict):
-        return peer_id, msg_type, dict(msg_payload_raw)
+        return peer_id, msg_type, msg_payload_raw
+
+    return peer_id, None, None
+
+
+def parse_injected_hive_packet(
+    packet: Dict[str, Any],
+) -> Tuple[str, Optional[HiveMessageType], Optional[Dict[str, Any]]]:
+    """
+    Parse an injected packet from comms into (peer_id, msg_type, msg_payload).
+
+    Supported forms:
+    1) {"type": <int|name>, "version": <int>, "payload": {...}, "sender": "..."}
+    2) {"msg_type": <int|name>, "msg_payload": {...}, "sender": "..."}
+    3) {"raw_plaintext": "<hex or json envelope>", "sender": "..."}
+
+    The returned payload is the packet's own dict unless a field has to be
+    added to it; the injected packet is not used again after dispatch.
+    """
+    if not isinstance(packet, dict):
+        return "", None, None
+
+    result = _parse_structured(packet)
+    if result[1] is not None:
+        return result
+    peer_id = result[0]
 
     # Raw transport path (used when comms receives non-JSON plaintext)
     raw_plaintext = packet.get("raw_plaintext")
     if isinstance(raw_plaintext, str) and raw_plaintext:
-        # If raw plaintext is itself JSON, recurse on parsed object
-        try:
-            parsed = json.loads(raw_plaintext)
-            if isinstance(parsed, dict):
-                if "sender" not in parsed and peer_id:
-                    parsed["sender"] = peer_id
-                return parse_injected_hive_packet(parsed)
-        except Exception:
-            pass
+        # A JSON object is parsed as forms 1)/2) directly; only a nested
+        # raw_plaintext needs the full recursion. Cheap prefilters keep
+        # hex/wire payloads off the exception paths.
+        if raw_plaintext.lstrip().startswith("{"):
+            try:
+                parsed = _loads(raw_plaintext)
+                if isinstance(parsed, dict):
+                    if "sender" not in parsed and peer_id:
+                        parsed["sender"] = peer_id
+                    result = _parse_structured(parsed)
+                    if result[1] is None and "raw_plaintext" in parsed:
+                        return parse_injected_hive_packet(parsed)
+                    return result
+            except Exception:
+                pass
 
         data = None
-        try:
-            data = bytes.fromhex(raw_plaintext)
-        except Exception:
-            if raw_plaintext.startswith("HIVE"):
-                data = raw_plaintext.encode("utf-8")
+        if raw_plaintext.startswith("HIVE"):
+            data = raw_plaintext.encode("utf-8")
+        elif not raw_plaintext.translate(_HEX_CHARS_TABLE):
+            try:
+                data = bytes.fromhex(raw_plaintext)
+            except ValueError:
+                pass
 
         if data is not None:
             msg_type, msg_payload = deserialize(data)
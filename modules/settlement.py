@@ -19,14 +19,17 @@ Thread Safety:
 - Uses thread-local database connections via HiveDatabase pattern
 """
 
+import asyncio
+import datetime
+import hashlib
 import os
 import time
 import json
 import sqlite3
 import threading
 from dataclasses import dataclass, asdict, field
+from functools import lru_cache
 from typing import Dict, List, Optional, Any, Tuple
-from decimal import Decimal, ROUND_DOWN
 
 from . import network_metrics
 
@@ -63,6 +66,81 @@ def calculate_min_payment(total_fees: int, member_count: int) -> int:
     dynamic_min = total_fees // (member_count * 10)
     return max(MIN_PAYMENT_FLOOR_SATS, dynamic_min)
 
+@lru_cache(maxsize=128)
+def _plan_hash_cached(
+    plan_version: int,
+    period: str,
+    data_hash: str,
+    min_payment_sats: int,
+    canon_payments: Tuple[Tuple[str, str, int], ...],
+) -> str:
+    """
+    SettlementManager._plan_hash() for sorted (from, to, amount) triples.
+
+    Streams the exact bytes of the sort_keys/compact JSON payload into the
+    hash one payment at a time instead of materializing the whole document.
+    """
+    dumps = json.dumps
+    h = hashlib.sha256(
+        ('{"data_hash":%s,"min_payment_sats":%d,"payments":['
+         % (dumps(data_hash), min_payment_sats)).encode()
+    )
+    sep = ""
+    for f, t, a in canon_payments:
+        h.update(('%s{"amount_sats":%d,"from_peer":%s,"to_peer":%s}'
+                  % (sep, a, dumps(f), dumps(t))).encode())
+        sep = ","
+    h.update(('],"period":%s,"v":%d}' % (dumps(period), plan_version)).encode())
+    return h.hexdigest()
+
+
+# Snapshot fields a settlement plan depends on (see compute_settlement_plan)
+_PLAN_INPUT_FIELDS = (
+    "peer_id", "capacity", "forward_count", "fees_earned", "rebalance_costs", "uptime",
+)
+
+
+@lru_cache(maxsize=256)
+def _period_for_hour(hour: int) -> str:
+    """YYYY-WW ISO week (UTC) containing the given hour since the epoch."""
+    dt = datetime.datetime.fromtimestamp(hour * 3600, tz=datetime.timezone.utc)
+    iso_year, iso_week, _ = dt.isocalendar()
+    return f"{iso_year}-{iso_week:02d}"
+
+
+# Hot-path statements, shared so each thread's connection reuses one
+# prepared statement per shape from the sqlite3 statement cache.
+_SQL_UPSERT_OFFER = (
+    "INSERT INTO settlement_offers (peer_id, bolt12_offer, registered_at, active) "
+    "VALUES (?, ?, ?, 1) "
+    "ON CONFLICT(peer_id) DO UPDATE SET bolt12_offer = excluded.bolt12_offer, "
+    "registered_at = excluded.registered_at, active = 1"
+)
+_SQL_GET_OFFER = "SELECT bolt12_offer FROM settlement_offers WHERE peer_id = ? AND active = 1"
+_SQL_LIST_OFFERS = (
+    "SELECT peer_id, bolt12_offer, registered_at, last_verified, active "
+    "FROM settlement_offers ORDER BY registered_at DESC"
+)
+_SQL_DEACTIVATE_OFFER = "UPDATE settlement_offers SET active = 0 WHERE peer_id = ?"
+_SQL_CREATE_PERIOD = (
+    "INSERT INTO settlement_periods (start_time, end_time, status) VALUES (?, ?, 'pending')"
+)
+_SQL_INSERT_PAYMENT = (
+    "INSERT INTO settlement_payments (period_id, from_peer_id, to_peer_id, amount_sats, "
+    "bolt12_offer, status) VALUES (?, ?, ?, ?, ?, 'pending')"
+)
+_SQL_UPSERT_CONTRIBUTION = (
+    "INSERT INTO settlement_contributions (period_id, peer_id, capacity_sats, forwards_sats, "
+    "fees_earned_sats, uptime_pct, fair_share_sats, balance_sats, rebalance_costs_sats, "
+    "net_profit_sats) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(period_id, peer_id) DO UPDATE SET "
+    "capacity_sats = excluded.capacity_sats, forwards_sats = excluded.forwards_sats, "
+    "fees_earned_sats = excluded.fees_earned_sats, uptime_pct = excluded.uptime_pct, "
+    "fair_share_sats = excluded.fair_share_sats, balance_sats = excluded.balance_sats, "
+    "rebalance_costs_sats = excluded.rebalance_costs_sats, net_profit_sats = excluded.net_profit_sats"
+)
+
+
 # Fair share weights (standard mode)
 WEIGHT_CAPACITY = 0.30
 WEIGHT_FORWARDS = 0.60
@@ -80,7 +158,7 @@ HIGH_CENTRALITY_THRESHOLD = 0.7  # Members above this get full network bonus
 MIN_CENTRALITY_FOR_BONUS = 0.3   # Members below this get no network bonus
 
 
-@dataclass
+@dataclass(slots=True)
 class MemberContribution:
     """A member's contribution metrics for a settlement period."""
     peer_id: str
@@ -94,14 +172,15 @@ class MemberContribution:
     # Network position metrics (Use Case 6)
     hive_centrality: float = 0.0
     rebalance_hub_score: float = 0.0
+    # Net profit capped at 0 (no negative contributions); derived once,
+    # fees and costs are fixed for the settlement being computed
+    net_profit_sats: int = field(init=False)
 
-    @property
-    def net_profit_sats(self) -> int:
-        """Net profit capped at 0 (no negative contributions)."""
-        return max(0, self.fees_earned_sats - self.rebalance_costs_sats)
+    def __post_init__(self):
+        self.net_profit_sats = max(0, self.fees_earned_sats - self.rebalance_costs_sats)
 
 
-@dataclass
+@dataclass(slots=True)
 class SettlementResult:
     """Result of settlement calculation for one member."""
     peer_id: str
@@ -117,7 +196,7 @@ class SettlementResult:
     network_bonus_sats: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class SettlementPayment:
     """A payment to execute in settlement."""
     from_peer: str
@@ -140,6 +219,10 @@ class SettlementManager:
     - Settlement history tracking
     """
 
+    MAX_CACHED_PLANS = 32
+    # In-flight BOLT12 payments per settlement execution
+    MAX_CONCURRENT_PAYMENTS = 4
+
     def __init__(self, database, plugin, rpc=None):
         """
         Initialize the settlement manager.
@@ -154,6 +237,8 @@ class SettlementManager:
         self.rpc = rpc
         self._local = threading.local()
         self.did_credential_mgr = None  # Set after DID init (Phase 16)
+        # compute_settlement_plan() memo, keyed by the typed plan inputs
+        self._plan_cache: Dict[tuple, Dict[str, Any]] = {}
 
     def _get_connection(self) -> sqlite3.Connection:
         """Get thread-local database connection."""
@@ -216,9 +301,13 @@ class SettlementManager:
             )
         """)
 
+        # UNIQUE (period_id, peer_id) already indexes per-period lookups;
+        # the old single-column index only cost an extra write per row.
+        conn.execute("DROP INDEX IF EXISTS idx_settlement_contrib_period")
+        # Per-member history (WHERE peer_id = ? ORDER BY period_id DESC)
         conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_settlement_contrib_period
-            ON settlement_contributions(period_id)
+            CREATE INDEX IF NOT EXISTS idx_settlement_contrib_peer_period
+            ON settlement_contributions(peer_id, period_id)
         """)
         # Add columns if upgrading from older schema (Issue #42: net profit settlement)
         try:
@@ -254,11 +343,16 @@ class SettlementManager:
             )
         """)
 
+        # Serves both per-period listing and update_payment_status()'s
+        # (period_id, from_peer_id, to_peer_id) lookup
+        conn.execute("DROP INDEX IF EXISTS idx_settlement_payments_period")
         conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_settlement_payments_period
-            ON settlement_payments(period_id)
+            CREATE INDEX IF NOT EXISTS idx_settlement_payments_period_route
+            ON settlement_payments(period_id, from_peer_id, to_peer_id)
         """)
 
+        # Refresh planner stats for the indexes above
+        conn.execute("PRAGMA optimize;")
         self.plugin.log("Settlement tables initialized")
 
     # =========================================================================
@@ -282,14 +376,7 @@ class SettlementManager:
         conn = self._get_connection()
         now = int(time.time())
 
-        conn.execute("""
-            INSERT INTO settlement_offers (peer_id, bolt12_offer, registered_at, active)
-            VALUES (?, ?, ?, 1)
-            ON CONFLICT(peer_id) DO UPDATE SET
-                bolt12_offer = excluded.bolt12_offer,
-                registered_at = excluded.registered_at,
-                active = 1
-        """, (peer_id, bolt12_offer, now))
+        conn.execute(_SQL_UPSERT_OFFER, (peer_id, bolt12_offer, now))
 
         self.plugin.log(f"Registered BOLT12 offer for {peer_id[:16]}...")
 
@@ -303,29 +390,35 @@ class SettlementManager:
     def get_offer(self, peer_id: str) -> Optional[str]:
         """Get the BOLT12 offer for a member."""
         conn = self._get_connection()
-        row = conn.execute(
-            "SELECT bolt12_offer FROM settlement_offers WHERE peer_id = ? AND active = 1",
-            (peer_id,)
-        ).fetchone()
-        return row["bolt12_offer"] if row else None
+        row = conn.execute(_SQL_GET_OFFER, (peer_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_offers(self, peer_ids: List[str]) -> Dict[str, str]:
+        """Get active BOLT12 offers for several members in one query per 500 ids."""
+        conn = self._get_connection()
+        ids = list(dict.fromkeys(peer_ids))
+        offers: Dict[str, str] = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT peer_id, bolt12_offer FROM settlement_offers "
+                f"WHERE active = 1 AND peer_id IN ({placeholders})",
+                chunk
+            ).fetchall()
+            offers.update((row[0], row[1]) for row in rows)
+        return offers
 
     def list_offers(self) -> Dict[str, Any]:
         """List all registered BOLT12 offers."""
         conn = self._get_connection()
-        rows = conn.execute("""
-            SELECT peer_id, bolt12_offer, registered_at, last_verified, active
-            FROM settlement_offers
-            ORDER BY registered_at DESC
-        """).fetchall()
+        rows = conn.execute(_SQL_LIST_OFFERS).fetchall()
         return {"offers": [dict(row) for row in rows]}
 
     def deactivate_offer(self, peer_id: str) -> Dict[str, Any]:
         """Deactivate a member's BOLT12 offer."""
         conn = self._get_connection()
-        conn.execute(
-            "UPDATE settlement_offers SET active = 0 WHERE peer_id = ?",
-            (peer_id,)
-        )
+        conn.execute(_SQL_DEACTIVATE_OFFER, (peer_id,))
         return {"status": "deactivated", "peer_id": peer_id}
 
     def generate_and_register_offer(self, peer_id: str) -> Dict[str, Any]:
@@ -456,60 +549,73 @@ class SettlementManager:
         total_network_score = sum(c.hive_centrality for c in contributions)
 
         # Step 1: compute unnormalized weighted contribution scores per member.
-        raw_scores: Dict[str, float] = {}
-        raw_network_component: Dict[str, float] = {}
+        # Mode, weights and zero-total guards are fixed for the whole fleet,
+        # so they are resolved once instead of per member.
+        if network_optimized:
+            w_capacity, w_forwards, w_uptime = (
+                WEIGHT_CAPACITY_NETWORK, WEIGHT_FORWARDS_NETWORK, WEIGHT_UPTIME_NETWORK
+            )
+        else:
+            w_capacity, w_forwards, w_uptime = WEIGHT_CAPACITY, WEIGHT_FORWARDS, WEIGHT_UPTIME
+        use_capacity = total_capacity > 0
+        use_forwards = total_forwards > 0
+        use_uptime = total_uptime > 0
+        use_network = network_optimized and total_network_score > 0
+
+        # Per-member values live in parallel lists, one slot per peer_id in
+        # first-seen order (a repeated peer_id overwrites its slot, as the
+        # former peer_id-keyed dicts did). Input order is kept so the float
+        # sums below are unchanged.
+        slot_of: Dict[str, int] = {}
+        slot_ids: List[str] = []
+        raw_scores: List[float] = []
+        raw_network_component: List[float] = []
         for member in contributions:
-            capacity_score = (member.capacity_sats / total_capacity) if total_capacity > 0 else 0.0
-            forwards_score = (member.forwards_sats / total_forwards) if total_forwards > 0 else 0.0
-            uptime_score = (member.uptime_pct / total_uptime) if total_uptime > 0 else 0.0
-
-            if network_optimized:
-                network_score = (
-                    (member.hive_centrality / total_network_score) if total_network_score > 0 else 0.0
-                )
-                if member.hive_centrality < MIN_CENTRALITY_FOR_BONUS:
-                    network_score = 0.0
+            capacity_score = (member.capacity_sats / total_capacity) if use_capacity else 0.0
+            forwards_score = (member.forwards_sats / total_forwards) if use_forwards else 0.0
+            uptime_score = (member.uptime_pct / total_uptime) if use_uptime else 0.0
+            score = (
+                w_capacity * capacity_score +
+                w_forwards * forwards_score +
+                w_uptime * uptime_score
+            )
 
-                base_component = (
-                    WEIGHT_CAPACITY_NETWORK * capacity_score +
-                    WEIGHT_FORWARDS_NETWORK * forwards_score +
-                    WEIGHT_UPTIME_NETWORK * uptime_score
+            network_component = 0.0
+            if use_network and member.hive_centrality >= MIN_CENTRALITY_FOR_BONUS:
+                network_component = WEIGHT_NETWORK_POSITION * (
+                    member.hive_centrality / total_network_score
                 )
-                network_component = WEIGHT_NETWORK_POSITION * network_score
-                score = base_component + network_component
-
-                raw_scores[member.peer_id] = score
-                raw_network_component[member.peer_id] = network_component
+                score += network_component
+
+            slot = slot_of.get(member.peer_id)
+            if slot is None:
+                slot_of[member.peer_id] = len(slot_ids)
+                slot_ids.append(member.peer_id)
+                raw_scores.append(score)
+                raw_network_component.append(network_component)
             else:
-                score = (
-                    WEIGHT_CAPACITY * capacity_score +
-                    WEIGHT_FORWARDS * forwards_score +
-                    WEIGHT_UPTIME * uptime_score
-                )
-                raw_scores[member.peer_id] = score
-                raw_network_component[member.peer_id] = 0.0
+                raw_scores[slot] = score
+                raw_network_component[slot] = network_component
 
-        total_score = sum(raw_scores.values())
+        total_score = sum(raw_scores)
         if total_score <= 0:
             # Extremely defensive fallback: equal split.
-            raw_scores = {m.peer_id: 1.0 for m in contributions}
-            raw_network_component = {m.peer_id: 0.0 for m in contributions}
+            raw_scores = [1.0] * len(slot_ids)
+            raw_network_component = [0.0] * len(slot_ids)
             total_score = float(len(contributions))
 
-        # Step 2: normalize scores so they sum to 1.0 across the fleet.
-        norm_scores: Dict[str, float] = {pid: (s / total_score) for pid, s in raw_scores.items()}
-
-        # Step 3: allocate integer fair_shares that sum exactly to total_net_profit
+        # Step 2 + 3: normalize scores so they sum to 1.0 across the fleet, then
+        # allocate integer fair_shares that sum exactly to total_net_profit
         # using a largest-remainder method (deterministic tie-break by peer_id).
-        ideals: Dict[str, float] = {pid: (total_net_profit * w) for pid, w in norm_scores.items()}
-        floors: Dict[str, int] = {pid: int(v) for pid, v in ideals.items()}
-        allocated = sum(floors.values())
+        ideals = [total_net_profit * (s / total_score) for s in raw_scores]
+        floors = [int(v) for v in ideals]
+        allocated = sum(floors)
         remainder = total_net_profit - allocated
 
         # Sort by fractional remainder desc, then peer_id asc for determinism.
         frac_order = sorted(
-            ideals.keys(),
-            key=lambda pid: (-(ideals[pid] - floors[pid]), pid)
+            range(len(slot_ids)),
+            key=lambda i: (-(ideals[i] - floors[i]), slot_ids[i])
         )
         for i in range(max(0, min(remainder, len(frac_order)))):
             floors[frac_order[i]] += 1
@@ -517,11 +623,12 @@ class SettlementManager:
         # Step 4: build SettlementResult list
         results: List[SettlementResult] = []
         for member in sorted(contributions, key=lambda m: m.peer_id):
-            fair_share = floors.get(member.peer_id, 0)
+            slot = slot_of[member.peer_id]
+            fair_share = floors[slot]
             member_net_profit = member.net_profit_sats
             balance = fair_share - member_net_profit
 
-            network_component = raw_network_component.get(member.peer_id, 0.0)
+            network_component = raw_network_component[slot]
             network_score = 0.0
             network_bonus_sats = 0
             if network_optimized and total_net_profit > 0 and total_score > 0:
@@ -559,7 +666,22 @@ class SettlementManager:
         min_payment_sats: int,
         payments: List[Dict[str, Any]],
     ) -> str:
-        import hashlib
+        # Plans from generate_payment_plan() are plain str/str/int triples:
+        # hash those through the memoized path (consensus rounds re-hash the
+        # same plan several times per period).
+        triples = []
+        for p in payments:
+            if len(p) != 3:
+                break
+            f, t, a = p.get("from_peer"), p.get("to_peer"), p.get("amount_sats")
+            if type(f) is not str or type(t) is not str or type(a) is not int:
+                break
+            triples.append((f, t, a))
+        else:
+            if type(plan_version) is int and type(period) is str and type(data_hash) is str:
+                return _plan_hash_cached(
+                    plan_version, period, data_hash, int(min_payment_sats), tuple(sorted(triples))
+                )
 
         # Canonicalize payments ordering.
         canon_payments = sorted(
@@ -601,28 +723,43 @@ class SettlementManager:
         payers.sort(key=lambda r: (r.balance, r.peer_id))
         receivers.sort(key=lambda r: (-r.balance, r.peer_id))
 
-        payer_remaining = {p.peer_id: -p.balance for p in payers}
-        receiver_remaining = {r.peer_id: r.balance for r in receivers}
+        # Remaining amounts live in flat lists indexed per peer (a peer listed
+        # twice shares one slot, as with the former peer_id-keyed dicts).
+        # Receivers only ever drain, so those before first_open are skipped.
+        payer_slot = {pid: i for i, pid in enumerate(dict.fromkeys(p.peer_id for p in payers))}
+        receiver_slot = {pid: i for i, pid in enumerate(dict.fromkeys(r.peer_id for r in receivers))}
+        payer_remaining = [0] * len(payer_slot)
+        receiver_remaining = [0] * len(receiver_slot)
+        for p in payers:
+            payer_remaining[payer_slot[p.peer_id]] = -p.balance
+        for r in receivers:
+            receiver_remaining[receiver_slot[r.peer_id]] = r.balance
+        receiver_ids = [r.peer_id for r in receivers]
+        receiver_idx = [receiver_slot[pid] for pid in receiver_ids]
+        first_open = 0
 
         payments: List[Dict[str, Any]] = []
         for payer in payers:
-            owing = payer_remaining.get(payer.peer_id, 0)
+            slot = payer_slot[payer.peer_id]
+            owing = payer_remaining[slot]
             if owing <= 0:
                 continue
-            for receiver in receivers:
-                owed = receiver_remaining.get(receiver.peer_id, 0)
+            while first_open < len(receiver_idx) and receiver_remaining[receiver_idx[first_open]] <= 0:
+                first_open += 1
+            for j in range(first_open, len(receiver_idx)):
+                r_slot = receiver_idx[j]
+                owed = receiver_remaining[r_slot]
                 if owed <= 0:
                     continue
                 amount = min(owing, owed)
                 if amount < min_payment:
                     continue
                 payments.append(
-                    {"from_peer": payer.peer_id, "to_peer": receiver.peer_id, "amount_sats": int(amount)}
+                    {"from_peer": payer.peer_id, "to_peer": receiver_ids[j], "amount_sats": int(amount)}
                 )
                 owing -= amount
-                owed -= amount
-                payer_remaining[payer.peer_id] = owing
-                receiver_remaining[receiver.peer_id] = owed
+                receiver_remaining[r_slot] = owed - amount
+                payer_remaining[slot] = owing
                 if owing <= 0:
                     break
 
@@ -636,22 +773,73 @@ class SettlementManager:
         """
         Compute a deterministic settlement plan (payments + hashes) from a canonical
         contributions snapshot.
+
+        Proposal, vote, execution and completion all recompute the plan for
+        the same snapshot, so plans are memoized by the exact inputs they
+        depend on. The returned dict may be shared: treat it as read-only.
         """
+        # Keyed by (type, repr) of each input so values that compare equal
+        # but format differently in data_hash (0.0 / -0.0, 1 / 1.0) never
+        # share a plan; a missing field is distinct from an explicit None.
+        try:
+            key = (
+                DISTRIBUTED_SETTLEMENT_PLAN_VERSION,
+                period,
+                tuple(
+                    tuple(
+                        (type(c[f]), repr(c[f])) if f in c else None
+                        for f in _PLAN_INPUT_FIELDS
+                    )
+                    for c in contributions
+                ),
+            )
+        except (AttributeError, TypeError, KeyError):
+            key = None  # non-dict entries: compute uncached
+
+        if key is not None:
+            cached = self._plan_cache.get(key)
+            if cached is not None:
+                return cached
+
+        plan = self._build_settlement_plan(period, contributions)
+
+        if key is not None:
+            if len(self._plan_cache) >= self.MAX_CACHED_PLANS:
+                # Drop the oldest half (dicts preserve insertion order)
+                for old_key in list(self._plan_cache)[:self.MAX_CACHED_PLANS // 2]:
+                    self._plan_cache.pop(old_key, None)
+            self._plan_cache[key] = plan
+        return plan
+
+    def _build_settlement_plan(
+        self,
+        period: str,
+        contributions: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """compute_settlement_plan() without the memo."""
+        # One pass: parse each snapshot entry once and total fees alongside
         member_contributions: List[MemberContribution] = []
+        total_fees = 0
         for c in contributions:
             uptime = c.get("uptime", 100)
-            try:
-                uptime_pct = float(uptime) / 100.0
-            except Exception:
-                uptime_pct = 1.0
+            if isinstance(uptime, (int, float)):
+                # Gossip snapshots carry an int percent; skip the try/except
+                uptime_pct = uptime / 100.0
+            else:
+                try:
+                    uptime_pct = float(uptime) / 100.0
+                except Exception:
+                    uptime_pct = 1.0
 
+            fees_earned = int(c.get("fees_earned", 0))
+            total_fees += fees_earned
             member_contributions.append(
                 MemberContribution(
                     peer_id=c["peer_id"],
                     capacity_sats=int(c.get("capacity", 0)),
                     # forward_count is the routing activity metric from gossip
                     forwards_sats=int(c.get("forward_count", 0)),
-                    fees_earned_sats=int(c.get("fees_earned", 0)),
+                    fees_earned_sats=fees_earned,
                     rebalance_costs_sats=int(c.get("rebalance_costs", 0)),
                     uptime_pct=uptime_pct,
                 )
@@ -659,12 +847,18 @@ class SettlementManager:
 
         data_hash = self.calculate_settlement_hash(period, contributions)
         results = self.calculate_fair_shares(member_contributions)
-        total_fees = sum(int(c.get("fees_earned", 0)) for c in contributions)
         payments, min_payment = self.generate_payment_plan(results, total_fees=total_fees)
 
+        # Per-payer totals and the overall sum in one walk over payments
+        expected_sent: Dict[str, int] = {}
+        total_in_payments = 0
+        for p in payments:
+            amount = int(p["amount_sats"])
+            total_in_payments += amount
+            expected_sent[p["from_peer"]] = expected_sent.get(p["from_peer"], 0) + amount
+
         # Track residual dust that couldn't be settled (below min_payment threshold)
         total_payer_debt = sum(-r.balance for r in results if r.balance < -min_payment)
-        total_in_payments = sum(int(p["amount_sats"]) for p in payments)
         residual_sats = max(0, total_payer_debt - total_in_payments)
 
         plan_hash = self._plan_hash(
@@ -675,10 +869,6 @@ class SettlementManager:
             payments=payments,
         )
 
-        expected_sent: Dict[str, int] = {}
-        for p in payments:
-            expected_sent[p["from_peer"]] = expected_sent.get(p["from_peer"], 0) + int(p["amount_sats"])
-
         return {
             "plan_version": DISTRIBUTED_SETTLEMENT_PLAN_VERSION,
             "period": period,
@@ -698,7 +888,9 @@ class SettlementManager:
         """
         Enrich member contributions with network position metrics.
 
-        Fetches hive centrality and rebalance hub score for each member.
+        Fetches hive centrality and rebalance hub score for each member from
+        one metrics snapshot (a per-member lookup refreshes the whole fleet
+        whenever a member is missing from the calculator cache).
 
         Args:
             contributions: List of member contributions
@@ -710,8 +902,9 @@ class SettlementManager:
         if not calculator:
             return contributions
 
+        metrics_map = calculator.get_all_metrics()
         for contrib in contributions:
-            metrics = calculator.get_member_metrics(contrib.peer_id)
+            metrics = metrics_map.get(contrib.peer_id)
             if metrics:
                 contrib.hive_centrality = metrics.hive_centrality
                 contrib.rebalance_hub_score = metrics.rebalance_hub_score
@@ -772,10 +965,7 @@ class SettlementManager:
         conn = self._get_connection()
         now = int(time.time())
 
-        cursor = conn.execute("""
-            INSERT INTO settlement_periods (start_time, end_time, status)
-            VALUES (?, ?, 'pending')
-        """, (now - SETTLEMENT_PERIOD_SECONDS, now))
+        cursor = conn.execute(_SQL_CREATE_PERIOD, (now - SETTLEMENT_PERIOD_SECONDS, now))
 
         return cursor.lastrowid
 
@@ -785,62 +975,46 @@ class SettlementManager:
         results: List[SettlementResult],
         contributions: List[MemberContribution]
     ):
-        """Record contributions and results for a settlement period."""
-        conn = self._get_connection()
+        """
+        Record contributions and results for a settlement period.
 
+        All rows and the period totals are written in one transaction;
+        re-recording a period overwrites its rows instead of failing on
+        UNIQUE (period_id, peer_id).
+        """
         # Create lookup for contributions
         contrib_map = {c.peer_id: c for c in contributions}
 
         total_fees = sum(r.fees_earned for r in results)
 
-        for result in results:
-            contrib = contrib_map.get(result.peer_id)
-            if not contrib:
-                continue
+        cm = contrib_map
+        rows = [
+            (period_id, r.peer_id, c.capacity_sats, c.forwards_sats,
+             r.fees_earned, c.uptime_pct, r.fair_share, r.balance,
+             r.rebalance_costs, r.net_profit)
+            for r in results
+            for c in (cm.get(r.peer_id),)
+            if c is not None
+        ]
 
-            conn.execute("""
-                INSERT INTO settlement_contributions (
-                    period_id, peer_id, capacity_sats, forwards_sats,
-                    fees_earned_sats, uptime_pct, fair_share_sats, balance_sats,
-                    rebalance_costs_sats, net_profit_sats
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                period_id,
-                result.peer_id,
-                contrib.capacity_sats,
-                contrib.forwards_sats,
-                result.fees_earned,
-                contrib.uptime_pct,
-                result.fair_share,
-                result.balance,
-                result.rebalance_costs,
-                result.net_profit
-            ))
+        with self.db.transaction() as conn:
+            conn.executemany(_SQL_UPSERT_CONTRIBUTION, rows)
 
-        # Update period totals
-        conn.execute("""
-            UPDATE settlement_periods
-            SET total_fees_sats = ?, total_members = ?
-            WHERE period_id = ?
-        """, (total_fees, len(results), period_id))
+            # Update period totals
+            conn.execute("""
+                UPDATE settlement_periods
+                SET total_fees_sats = ?, total_members = ?
+                WHERE period_id = ?
+            """, (total_fees, len(results), period_id))
 
     def record_payments(self, period_id: int, payments: List[SettlementPayment]):
-        """Record planned payments for a settlement period."""
-        conn = self._get_connection()
-
-        for payment in payments:
-            conn.execute("""
-                INSERT INTO settlement_payments (
-                    period_id, from_peer_id, to_peer_id, amount_sats,
-                    bolt12_offer, status
-                ) VALUES (?, ?, ?, ?, ?, 'pending')
-            """, (
-                period_id,
-                payment.from_peer,
-                payment.to_peer,
-                payment.amount_sats,
-                payment.bolt12_offer
-            ))
+        """Record planned payments for a settlement period (all or none)."""
+        rows = [
+            (period_id, p.from_peer, p.to_peer, p.amount_sats, p.bolt12_offer)
+            for p in payments
+        ]
+        with self.db.transaction() as conn:
+            conn.executemany(_SQL_INSERT_PAYMENT, rows)
 
     async def execute_payment(self, payment: SettlementPayment) -> SettlementPayment:
         """
@@ -859,7 +1033,10 @@ class SettlementManager:
 
         try:
             # Use fetchinvoice to get invoice from BOLT12 offer
-            invoice_result = self.rpc.fetchinvoice(
+            # RPC calls block, so run them off the event loop to let
+            # concurrent payments overlap.
+            invoice_result = await asyncio.to_thread(
+                self.rpc.fetchinvoice,
                 offer=payment.bolt12_offer,
                 amount_msat=f"{payment.amount_sats * 1000}msat"
             )
@@ -872,7 +1049,7 @@ class SettlementManager:
             bolt12_invoice = invoice_result["invoice"]
 
             # Pay the invoice
-            pay_result = self.rpc.pay(bolt12_invoice)
+            pay_result = await asyncio.to_thread(self.rpc.pay, bolt12_invoice)
 
             if pay_result.get("status") == "complete":
                 payment.status = "completed"
@@ -994,21 +1171,15 @@ class SettlementManager:
         Returns:
             Period string in YYYY-WW format (ISO week)
         """
-        import datetime
         if timestamp is None:
             timestamp = int(time.time())
-        dt = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
-        iso_year, iso_week, _ = dt.isocalendar()
-        return f"{iso_year}-{iso_week:02d}"
+        # ISO weeks start on an hour boundary, so the hour fixes the period
+        return _period_for_hour(int(timestamp // 3600))
 
     @staticmethod
     def get_previous_period() -> str:
         """Get the period string for the previous week."""
-        import datetime
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
-        prev_week = now - datetime.timedelta(weeks=1)
-        iso_year, iso_week, _ = prev_week.isocalendar()
-        return f"{iso_year}-{iso_week:02d}"
+        return _period_for_hour(int(time.time() - SETTLEMENT_PERIOD_SECONDS) // 3600)
 
     @staticmethod
     def calculate_settlement_hash(
@@ -1028,23 +1199,22 @@ class SettlementManager:
         Returns:
             SHA256 hash (64 hex chars)
         """
-        import hashlib
-
         # Sort contributions by peer_id for determinism
         sorted_contribs = sorted(contributions, key=lambda x: x.get('peer_id', ''))
 
-        # Build canonical string - include costs for net profit settlement (Issue #42)
-        canonical_parts = [period]
+        # Hash the canonical "period|peer:fees:costs:capacity:uptime|..."
+        # string part by part - include costs for net profit settlement
+        # (Issue #42)
+        h = hashlib.sha256(period.encode())
         for c in sorted_contribs:
             peer_id = c.get('peer_id', '')
             fees = c.get('fees_earned', 0)
             costs = c.get('rebalance_costs', 0)
             capacity = c.get('capacity', 0)
             uptime = c.get('uptime', 100)
-            canonical_parts.append(f"{peer_id}:{fees}:{costs}:{capacity}:{uptime}")
+            h.update(f"|{peer_id}:{fees}:{costs}:{capacity}:{uptime}".encode())
 
-        canonical_string = "|".join(canonical_parts)
-        return hashlib.sha256(canonical_string.encode()).hexdigest()
+        return h.hexdigest()
 
     def gather_contributions_from_gossip(
         self,
@@ -1073,6 +1243,14 @@ class SettlementManager:
         db_fee_reports = self.db.get_fee_reports_for_period(period)
         db_fees_by_peer = {r['peer_id']: r for r in db_fee_reports}
 
+        # Phase 16: reputation tiers for all members in one lookup
+        tiers: Dict[str, str] = {}
+        if self.did_credential_mgr:
+            try:
+                tiers = self.did_credential_mgr.get_credit_tiers([m['peer_id'] for m in all_members])
+            except Exception:
+                tiers = {}
+
         for member in all_members:
             peer_id = member['peer_id']
 
@@ -1105,13 +1283,8 @@ class SettlementManager:
             except Exception:
                 uptime = 100
 
-            # Phase 16: Get reputation tier for settlement terms metadata
-            reputation_tier = "newcomer"
-            if self.did_credential_mgr:
-                try:
-                    reputation_tier = self.did_credential_mgr.get_credit_tier(peer_id)
-                except Exception:
-                    pass
+            # Phase 16: Reputation tier for settlement terms metadata
+            reputation_tier = tiers.get(peer_id, "newcomer")
 
             contributions.append({
                 'peer_id': peer_id,
@@ -1476,13 +1649,16 @@ class SettlementManager:
 
         total_sent = 0
         payment_hashes: List[str] = []
+        pending: List[SettlementPayment] = []
+
+        # Sub-payments already made for this proposal (crash recovery)
+        paid_subs = self.db.get_settlement_sub_payments(proposal_id, our_peer_id) if self.db else {}
 
         for p in our_payments:
             to_peer = p["to_peer"]
             amount = int(p["amount_sats"])
 
-            # Check if we already paid this sub-payment (crash recovery)
-            already_paid = self.db.get_settlement_sub_payment(proposal_id, our_peer_id, to_peer) if self.db else None
+            already_paid = paid_subs.get(to_peer)
             if already_paid and already_paid.get("status") == "completed":
                 self.plugin.log(
                     f"SETTLEMENT: Skipping already-completed payment to {to_peer[:16]}... "
@@ -1504,28 +1680,45 @@ class SettlementManager:
                 )
                 return None
 
-            pay = SettlementPayment(
+            pending.append(SettlementPayment(
                 from_peer=our_peer_id,
                 to_peer=to_peer,
                 amount_sats=amount,
                 bolt12_offer=offer,
-            )
-            pay = await self.execute_payment(pay)
-            if pay.status != "completed":
-                self.plugin.log(
-                    f"SETTLEMENT: Payment failed to {to_peer[:16]}... for {amount} sats: {pay.error}",
-                    level="warn"
-                )
-                return None
-
-            # Record successful sub-payment for crash recovery
-            if self.db:
-                self.db.record_settlement_sub_payment(
-                    proposal_id, our_peer_id, to_peer, amount,
-                    pay.payment_hash or "", "completed"
-                )
+            ))
 
-            total_sent += amount
+        # Receivers are independent, so pay them concurrently (bounded).
+        # Once one payment fails, queued ones are not started.
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT_PAYMENTS)
+        failed = False
+
+        async def _pay(pay: SettlementPayment) -> Optional[SettlementPayment]:
+            nonlocal failed
+            async with sem:
+                if failed:
+                    return None
+                pay = await self.execute_payment(pay)
+                if pay.status != "completed":
+                    failed = True
+                    self.plugin.log(
+                        f"SETTLEMENT: Payment failed to {pay.to_peer[:16]}... "
+                        f"for {pay.amount_sats} sats: {pay.error}",
+                        level="warn"
+                    )
+                    return None
+
+                # Record successful sub-payment for crash recovery
+                if self.db:
+                    self.db.record_settlement_sub_payment(
+                        proposal_id, our_peer_id, pay.to_peer, pay.amount_sats,
+                        pay.payment_hash or "", "completed"
+                    )
+                return pay
+
+        for pay in await asyncio.gather(*(_pay(pay) for pay in pending)):
+            if pay is None:
+                return None
+            total_sent += pay.amount_sats
             if pay.payment_hash:
                 payment_hashes.append(pay.payment_hash)
 
@@ -38,6 +38,57 @@ def database(mock_plugin, tmp_path):
     return db
 
 
+class TestConnectionPragmas:
+    """Per-thread connection tuning."""
+
+    def test_connection_pragmas_applied(self, database):
+        conn = database._get_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -HiveDatabase.PAGE_CACHE_KIB
+
+
+class TestSettlementSubPayments:
+    """Crash-recovery sub-payment lookup for one payer."""
+
+    def test_get_settlement_sub_payments_keyed_by_receiver(self, database):
+        database.record_settlement_sub_payment("p1", "A", "B", 100, "hb", "completed")
+        database.record_settlement_sub_payment("p1", "A", "C", 200, "hc", "completed")
+        database.record_settlement_sub_payment("p1", "X", "B", 300, "hx", "completed")
+        database.record_settlement_sub_payment("p2", "A", "B", 400, "hp", "completed")
+
+        subs = database.get_settlement_sub_payments("p1", "A")
+        assert set(subs) == {"B", "C"}
+        assert subs["C"]["amount_sats"] == 200
+        assert subs["B"] == database.get_settlement_sub_payment("p1", "A", "B")
+
+
+class TestManagementReceiptSignatures:
+    """Batched receipts are stored pending and signed in place later."""
+
+    def test_pending_receipts_listed_then_signed(self, database):
+        assert database.store_management_credential(
+            credential_id="c1", issuer_id="i", agent_id="a", node_id="n",
+            tier="monitor", allowed_schemas_json="[]", constraints_json="{}",
+            valid_from=0, valid_until=2**31, signature="sig",
+        )
+        for i, receipt_id in enumerate(("r1", "r2")):
+            assert database.store_management_receipt(
+                receipt_id=receipt_id, credential_id="c1", schema_id="s", action="a",
+                params_json="{}", danger_score=1, result_json=None,
+                state_hash_before=None, state_hash_after=None,
+                executed_at=100 + i, executor_signature="pending",
+            )
+        assert [r["receipt_id"] for r in database.get_unsigned_management_receipts("pending")] == ["r1", "r2"]
+
+        assert database.update_management_receipt_signatures([("sig1", "r1"), ("sig2", "r2")])
+        assert database.get_unsigned_management_receipts("pending") == []
+        sigs = {r["receipt_id"]: r["executor_signature"]
+                for r in database.get_management_receipts("c1")}
+        assert sigs == {"r1": "sig1", "r2": "sig2"}
+
+
 class TestPendingActionsIndexes:
     """H-3: Verify indexes exist on pending_actions table."""
 
@@ -454,3 +505,25 @@ class TestNostrState:
             assert database.get_nostr_state("k3") == "v3b"
         finally:
             database.MAX_NOSTR_STATE_ROWS = original_cap
+
+    def test_set_nostr_states_batch(self, database):
+        assert database.set_nostr_states({"config:pubkey": "p1", "config:relays": "[]"})
+        assert database.get_nostr_state("config:pubkey") == "p1"
+        assert database.get_nostr_state("config:relays") == "[]"
+        assert not database.set_nostr_states({})
+        assert not database.set_nostr_states({"config:pubkey": None})
+
+    def test_set_nostr_states_row_cap_is_all_or_nothing(self, database):
+        original_cap = database.MAX_NOSTR_STATE_ROWS
+        database.MAX_NOSTR_STATE_ROWS = 3
+        try:
+            assert database.set_nostr_states({"k1": "v1", "k2": "v2"})
+            # Two new keys would exceed the cap: nothing is written.
+            assert not database.set_nostr_states({"k1": "v1b", "k3": "v3", "k4": "v4"})
+            assert database.get_nostr_state("k1") == "v1"
+            assert database.get_nostr_state("k3") is None
+            # Updates plus one new key fit.
+            assert database.set_nostr_states({"k1": "v1c", "k3": "v3"})
+            assert database.get_nostr_state("k1") == "v1c"
+        finally:
+            database.MAX_NOSTR_STATE_ROWS = original_cap
@@ -153,6 +153,15 @@ class MockDatabase:
         key = f"{subject_id}:{target_domain}"
         return self.reputation_cache.get(key)
 
+    def get_did_reputation_caches(self, subject_ids, domain=None):
+        target_domain = domain or "_all"
+        result = {}
+        for subject_id in subject_ids:
+            entry = self.reputation_cache.get(f"{subject_id}:{target_domain}")
+            if entry:
+                result[subject_id] = entry
+        return result
+
     def get_stale_did_reputation_cache(self, before_ts, limit=50):
         results = []
         for entry in self.reputation_cache.values():
@@ -855,6 +864,19 @@ class TestReputationAggregation:
         tier = mgr.get_credit_tier(BOB_PUBKEY)
         assert tier in ("newcomer", "recognized", "trusted", "senior")
 
+    def test_get_credit_tiers_matches_single_lookup(self):
+        mgr, db = _make_manager()
+        mgr.issue_credential(
+            subject_id=BOB_PUBKEY,
+            domain="hive:node",
+            metrics=_valid_node_metrics(),
+        )
+        tiers = mgr.get_credit_tiers([BOB_PUBKEY, CHARLIE_PUBKEY])
+        assert tiers == {
+            BOB_PUBKEY: mgr.get_credit_tier(BOB_PUBKEY),
+            CHARLIE_PUBKEY: "newcomer",
+        }
+
     def test_aggregate_persists_to_db_cache(self):
         mgr, db = _make_manager()
         mgr.issue_credential(
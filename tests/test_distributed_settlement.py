@@ -661,6 +661,100 @@ class TestExecuteAssignedPayments:
         assert kwargs["amount_paid_sats"] == 750
         assert kwargs["plan_hash"] == plan["plan_hash"]
 
+    def _four_member_setup(self, settlement_manager, mock_database):
+        period = "2024-05"
+        a = "02" + "a" * 64
+        contributions = [
+            {"peer_id": a, "fees_earned": 1000, "rebalance_costs": 0, "capacity": 1, "uptime": 100, "forward_count": 1},
+        ] + [
+            {"peer_id": "02" + ch * 64, "fees_earned": 0, "rebalance_costs": 0, "capacity": 1, "uptime": 100, "forward_count": 1}
+            for ch in "bcd"
+        ]
+        plan = settlement_manager.compute_settlement_plan(period, contributions)
+        proposal = {"proposal_id": "p1", "period": period, "plan_hash": plan["plan_hash"]}
+        settlement_manager.get_offer = Mock(return_value="lno1offer")
+        mock_database.has_executed_settlement.return_value = False
+        mock_database.get_settlement_sub_payments.return_value = {}
+        return proposal, contributions, a
+
+    def test_execute_our_settlement_pays_receivers_concurrently(
+        self, settlement_manager, mock_database, mock_rpc
+    ):
+        import asyncio
+        proposal, contributions, a = self._four_member_setup(settlement_manager, mock_database)
+        in_flight = 0
+        peak = 0
+
+        async def _exec_payment(payment: SettlementPayment) -> SettlementPayment:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            payment.status = "completed"
+            payment.payment_hash = f"h_{payment.to_peer[-4:]}"
+            return payment
+
+        settlement_manager.execute_payment = AsyncMock(side_effect=_exec_payment)
+        exec_result = asyncio.run(settlement_manager.execute_our_settlement(
+            proposal=proposal, contributions=contributions, our_peer_id=a, rpc=mock_rpc,
+        ))
+
+        assert exec_result is not None
+        assert exec_result["total_sent_sats"] == 750
+        assert peak == 3
+        assert mock_database.record_settlement_sub_payment.call_count == 3
+
+    def test_execute_our_settlement_skips_recorded_sub_payments(
+        self, settlement_manager, mock_database, mock_rpc
+    ):
+        import asyncio
+        proposal, contributions, a = self._four_member_setup(settlement_manager, mock_database)
+        b = "02" + "b" * 64
+        mock_database.get_settlement_sub_payments.return_value = {
+            b: {"to_peer_id": b, "status": "completed", "payment_hash": "h_prev"},
+        }
+
+        async def _exec_payment(payment: SettlementPayment) -> SettlementPayment:
+            payment.status = "completed"
+            payment.payment_hash = "h"
+            return payment
+
+        settlement_manager.execute_payment = AsyncMock(side_effect=_exec_payment)
+        exec_result = asyncio.run(settlement_manager.execute_our_settlement(
+            proposal=proposal, contributions=contributions, our_peer_id=a, rpc=mock_rpc,
+        ))
+
+        assert exec_result["total_sent_sats"] == 750
+        assert settlement_manager.execute_payment.call_count == 2
+        mock_database.get_settlement_sub_payments.assert_called_once_with("p1", a)
+
+    def test_execute_our_settlement_failure_aborts(
+        self, settlement_manager, mock_database, mock_rpc
+    ):
+        import asyncio
+        proposal, contributions, a = self._four_member_setup(settlement_manager, mock_database)
+        failing = "02" + "c" * 64
+
+        async def _exec_payment(payment: SettlementPayment) -> SettlementPayment:
+            if payment.to_peer == failing:
+                payment.status = "error"
+                payment.error = "no route"
+            else:
+                payment.status = "completed"
+                payment.payment_hash = "h"
+            return payment
+
+        settlement_manager.execute_payment = AsyncMock(side_effect=_exec_payment)
+        exec_result = asyncio.run(settlement_manager.execute_our_settlement(
+            proposal=proposal, contributions=contributions, our_peer_id=a, rpc=mock_rpc,
+        ))
+
+        assert exec_result is None
+        assert not mock_database.add_settlement_execution.called
+        recorded = {c.args[2] for c in mock_database.record_settlement_sub_payment.call_args_list}
+        assert failing not in recorded
+
 
 class TestCompletionValidation:
     def test_completion_requires_matching_expected_totals(self, settlement_manager, mock_database):
@@ -0,0 +1,70 @@
+"""Tests for the shared orjson/stdlib JSON helpers."""
+
+import json
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import json_codec
+
+
+SAMPLES = [
+    {"b": [1, 2, {"z": True, "a": None}], "a": "x"},
+    {"name": "café \U0001F600", "ctrl": "a\x01\n\t\"\\"},
+    {"floats": [0.1, 1e16, 1e-05, -0.0, 1.5e300, 100.0]},
+    {"big": 2**70, "neg": -2**64, "edge": 2**63},
+    {"nan": float("nan"), "inf": float("inf")},
+    [0, "02" + "ab" * 32, 1700000000, 1, [["t", "x"]], "content"],
+    {1: "non-str key"},
+    ("tuple", 1),
+]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        if json_codec.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(json_codec, "orjson", None)
+    return request.param
+
+
+@pytest.mark.parametrize("obj", SAMPLES)
+@pytest.mark.parametrize("sort_keys", [False, True])
+def test_dumps_matches_stdlib_bytes(backend, obj, sort_keys):
+    for ensure_ascii in (True, False):
+        expected = json.dumps(obj, sort_keys=sort_keys, ensure_ascii=ensure_ascii,
+                              separators=(",", ":"))
+        assert json_codec.dumps(obj, sort_keys=sort_keys, ensure_ascii=ensure_ascii) == expected
+    assert json_codec.dumps_utf8(obj, sort_keys=sort_keys) == json.dumps(
+        obj, sort_keys=sort_keys, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+@pytest.mark.parametrize("obj", SAMPLES)
+def test_loads_matches_stdlib(backend, obj):
+    text = json.dumps(obj)
+    for data in (text, text.encode()):
+        got = json_codec.loads(data)
+        expected = json.loads(data)
+        assert json.dumps(got) == json.dumps(expected)
+
+
+def test_loads_keeps_big_ints_exact(backend):
+    assert json_codec.loads('{"n": %d}' % 2**70) == {"n": 2**70}
+    assert json_codec.loads(b"[-%d]" % 2**64) == [-2**64]
+
+
+def test_loads_accepts_nan(backend):
+    value = json_codec.loads('{"x": NaN, "y": -Infinity}')
+    assert math.isnan(value["x"]) and value["y"] == float("-inf")
+
+
+def test_loads_rejects_invalid(backend):
+    with pytest.raises(ValueError):
+        json_codec.loads("{not json")
@@ -27,12 +27,18 @@ from modules.management_schemas import (
     ManagementSchemaRegistry,
     SCHEMA_REGISTRY,
     TIER_HIERARCHY,
+    VALID_SCHEMA_PATTERNS,
     VALID_TIERS,
     MAX_MANAGEMENT_CREDENTIALS,
     MAX_MANAGEMENT_RECEIPTS,
+    RECEIPT_BATCH_SIZE,
+    RECEIPT_SIGNATURE_PENDING,
     BASE_PRICE_PER_DANGER_POINT,
     TIER_PRICING_MULTIPLIERS,
+    encode_credential_signing_payload,
     get_credential_signing_payload,
+    get_receipt_batch_signing_payload,
+    verify_receipt_merkle_proof,
     _schema_matches,
     _is_valid_pubkey,
 )
@@ -77,6 +83,10 @@ class MockDatabase:
     def get_management_credential(self, credential_id):
         return self.credentials.get(credential_id)
 
+    def get_management_credentials_by_ids(self, credential_ids):
+        return {cid: self.credentials[cid] for cid in credential_ids
+                if cid in self.credentials}
+
     def get_management_credentials(self, agent_id=None, node_id=None,
                                     limit=100):
         results = []
@@ -117,6 +127,16 @@ class MockDatabase:
         }
         return True
 
+    def update_management_receipt_signatures(self, updates):
+        for executor_signature, receipt_id in updates:
+            self.receipts[receipt_id]["executor_signature"] = executor_signature
+        return True
+
+    def get_unsigned_management_receipts(self, marker, limit=1000):
+        results = [r for r in self.receipts.values()
+                   if r["executor_signature"] == marker]
+        return sorted(results, key=lambda r: r["executed_at"])[:limit]
+
     def get_management_receipts(self, credential_id, limit=100):
         results = [r for r in self.receipts.values()
                    if r["credential_id"] == credential_id]
@@ -335,6 +355,15 @@ class TestSchemaMatching:
     def test_empty_pattern(self):
         assert not _schema_matches("", "hive:fee-policy/v1")
 
+    def test_valid_patterns_match_some_schema(self):
+        """Every precomputed pattern matches a registered schema, and vice versa."""
+        candidates = set(VALID_SCHEMA_PATTERNS) | {
+            "hive:/*", "hive/*", "hive:fee/*", "hive:fee-policy/v9", "",
+        }
+        for pattern in candidates:
+            matches_any = any(_schema_matches(pattern, sid) for sid in SCHEMA_REGISTRY)
+            assert matches_any == (pattern in VALID_SCHEMA_PATTERNS), pattern
+
 
 # =============================================================================
 # ManagementSchemaRegistry Tests
@@ -946,6 +975,24 @@ class TestSigningPayload:
         p2 = get_credential_signing_payload(cred)
         assert p1 == p2
 
+    def test_matches_canonical_json_dumps(self):
+        """Field-wise encoding must stay byte-identical to sorted compact json.dumps."""
+        cred = {
+            "credential_id": "cred-\u00e9",
+            "issuer_id": ALICE_PUBKEY,
+            "agent_id": BOB_PUBKEY,
+            "node_id": CHARLIE_PUBKEY,
+            "tier": "advanced",
+            "allowed_schemas": ["hive:fee-policy/*", "hive:monitor/v1"],
+            "constraints": {"z": {"b": 1, "a": [1, 2]}, "max_fee_ppm": 1000},
+            "valid_from": 1000000,
+            "valid_until": 2000000,
+        }
+        payload, schemas_json, constraints_json = encode_credential_signing_payload(cred)
+        assert payload == json.dumps(cred, sort_keys=True, separators=(',', ':'))
+        assert json.loads(schemas_json) == cred["allowed_schemas"]
+        assert json.loads(constraints_json) == cred["constraints"]
+
     def test_includes_credential_id(self):
         """Signing payload must include credential_id (M3 fix)."""
         cred = {
@@ -1194,6 +1241,115 @@ class TestGossipHandlers:
         assert result is True
         assert len(db.credentials) == 1
 
+    def test_repeat_present_skips_checkmessage(self):
+        """A credential already verified is not re-sent to checkmessage."""
+        reg, db, rpc = self._make_registry_with_checkmessage()
+        payload = self._make_valid_credential_payload()
+        issuer_id = payload["credential"]["issuer_id"]
+        rpc.checkmessage.return_value = {"verified": True, "pubkey": issuer_id}
+
+        assert reg.handle_mgmt_credential_present(BOB_PUBKEY, payload) is True
+        assert reg.handle_mgmt_credential_present(ALICE_PUBKEY, payload) is True
+        assert rpc.checkmessage.call_count == 1
+
+    def test_queued_presents_coalesced(self):
+        """Duplicate presents within the window collapse to one verify + store."""
+        reg, db, rpc = self._make_registry_with_checkmessage()
+        payload = self._make_valid_credential_payload()
+        issuer_id = payload["credential"]["issuer_id"]
+        rpc.checkmessage.return_value = {"verified": True, "pubkey": issuer_id}
+
+        assert reg.queue_mgmt_credential_present(BOB_PUBKEY, payload) is True
+        assert reg.queue_mgmt_credential_present(ALICE_PUBKEY, payload) is True
+        assert len(db.credentials) == 0
+
+        assert reg.flush_credential_presents() == 1
+        assert len(db.credentials) == 1
+        assert rpc.checkmessage.call_count == 1
+
+    def test_queued_present_of_known_credential_skips_verify(self):
+        reg, db, rpc = self._make_registry_with_checkmessage()
+        payload = self._make_valid_credential_payload()
+        issuer_id = payload["credential"]["issuer_id"]
+        rpc.checkmessage.return_value = {"verified": True, "pubkey": issuer_id}
+        assert reg.handle_mgmt_credential_present(BOB_PUBKEY, payload) is True
+
+        fresh, _, fresh_rpc = self._make_registry_with_checkmessage()
+        fresh.db = db
+        fresh.queue_mgmt_credential_present(BOB_PUBKEY, payload)
+        assert fresh.flush_credential_presents() == 1
+        fresh_rpc.checkmessage.assert_not_called()
+
+    def test_queue_rejects_invalid_without_queueing(self):
+        reg, db, rpc = self._make_registry_with_checkmessage()
+        payload = self._make_valid_credential_payload(agent_id="bad")
+        assert reg.queue_mgmt_credential_present(BOB_PUBKEY, payload) is False
+        assert reg.flush_credential_presents() == 0
+
+    def test_queued_presents_flush_on_timer(self):
+        reg, db, rpc = self._make_registry_with_checkmessage()
+        payload = self._make_valid_credential_payload()
+        rpc.checkmessage.return_value = {
+            "verified": True, "pubkey": payload["credential"]["issuer_id"]}
+        reg.queue_mgmt_credential_present(BOB_PUBKEY, payload)
+        deadline = time.time() + 2
+        while not db.credentials and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(db.credentials) == 1
+
+    def test_forged_present_does_not_shadow_genuine_copy(self):
+        """A forged copy queued first must not crowd out the real one."""
+        reg, db, rpc = self._make_registry_with_checkmessage()
+        genuine = self._make_valid_credential_payload()
+        issuer_id = genuine["credential"]["issuer_id"]
+        forged = json.loads(json.dumps(genuine))
+        forged["credential"]["signature"] = "forged_signature"
+        rpc.checkmessage.side_effect = lambda message, zbase, pubkey: (
+            {"verified": True, "pubkey": issuer_id}
+            if zbase == "valid_signature_zbase32" else {"verified": False}
+        )
+
+        results = []
+        assert reg.queue_mgmt_credential_present(BOB_PUBKEY, forged, results.append)
+        assert reg.queue_mgmt_credential_present(ALICE_PUBKEY, genuine, results.append)
+        assert reg.flush_credential_presents() == 1
+
+        stored = db.credentials[genuine["credential"]["credential_id"]]
+        assert stored["signature"] == "valid_signature_zbase32"
+        assert results == [False, True]
+
+    def test_flush_worker_reused_across_bursts(self):
+        reg, db, rpc = self._make_registry_with_checkmessage()
+        db.close_connection = MagicMock()
+        rpc.checkmessage.return_value = {"verified": True, "pubkey": ALICE_PUBKEY}
+
+        threads = set()
+        for _ in range(3):
+            done = []
+            reg.queue_mgmt_credential_present(
+                BOB_PUBKEY, self._make_valid_credential_payload(), done.append)
+            deadline = time.time() + 2
+            while not done and time.time() < deadline:
+                time.sleep(0.01)
+            assert done == [True]
+            threads.add(reg._flush_thread)
+
+        assert len(threads) == 1
+        reg.stop()
+        assert not reg._flush_thread.is_alive()
+        db.close_connection.assert_called_once()
+
+    def test_failed_verification_not_cached(self):
+        reg, db, rpc = self._make_registry_with_checkmessage()
+        payload = self._make_valid_credential_payload()
+        issuer_id = payload["credential"]["issuer_id"]
+        rpc.checkmessage.return_value = {"verified": False}
+        assert reg.handle_mgmt_credential_present(BOB_PUBKEY, payload) is False
+
+        rpc.checkmessage.return_value = {"verified": True, "pubkey": issuer_id}
+        assert reg.handle_mgmt_credential_present(BOB_PUBKEY, payload) is True
+        assert rpc.checkmessage.call_count == 2
+
     def test_reject_invalid_agent_id_pubkey(self):
         """Credentials with invalid agent_id pubkey should be rejected (P2-M-3)."""
         reg, db, rpc = self._make_registry_with_checkmessage()
@@ -1420,3 +1576,122 @@ class TestReceiptSigningMalformed:
         )
         assert receipt_id is not None
         assert len(db.receipts) == 1
+
+
+# =============================================================================
+# Adaptive (Merkle-batched) Receipt Signing Tests
+# =============================================================================
+
+class TestReceiptBatchSigning:
+    """Low-danger receipts share one HSM signature over a Merkle root."""
+
+    def _issue(self, reg):
+        cred = reg.issue_credential(BOB_PUBKEY, ALICE_PUBKEY, "standard", ["*"], {})
+        assert cred is not None
+        reg.rpc.signmessage.reset_mock()
+        return cred
+
+    def test_low_danger_receipts_batched(self):
+        reg, db = _make_registry()
+        cred = self._issue(reg)
+        ids = [
+            reg.record_receipt(cred.credential_id, "hive:monitor/v1", "get_info", {})
+            for _ in range(RECEIPT_BATCH_SIZE - 1)
+        ]
+        assert all(ids)
+        assert reg.rpc.signmessage.call_count == 0
+        # Stored at once, unsigned until the batch is signed
+        assert set(db.receipts) == set(ids)
+        assert all(r["executor_signature"] == RECEIPT_SIGNATURE_PENDING
+                   for r in db.receipts.values())
+
+        ids.append(reg.record_receipt(cred.credential_id, "hive:monitor/v1", "get_info", {}))
+        assert reg.rpc.signmessage.call_count == 1
+        assert set(db.receipts) == set(ids)
+        assert all(r["executor_signature"] != RECEIPT_SIGNATURE_PENDING
+                   for r in db.receipts.values())
+
+    def test_batch_proofs_verify_against_signed_root(self):
+        reg, db = _make_registry()
+        cred = self._issue(reg)
+        for _ in range(5):
+            reg.record_receipt(cred.credential_id, "hive:monitor/v1", "list_peers", {})
+        assert reg.flush_pending_receipts() is True
+
+        signed_payload = reg.rpc.signmessage.call_args[0][0]
+        sigs = [json.loads(r["executor_signature"]) for r in db.receipts.values()]
+        assert {s["merkle_root"] for s in sigs} == {sigs[0]["merkle_root"]}
+        assert sorted(s["index"] for s in sigs) == list(range(5))
+        assert signed_payload == get_receipt_batch_signing_payload(sigs[0]["merkle_root"], 5)
+        assert all(s["batch_signature"] == "fakesig123" for s in sigs)
+
+    def test_merkle_proof_rejects_wrong_leaf(self):
+        from modules.management_schemas import _merkle_root_and_proofs
+        import hashlib
+        leaves = [hashlib.sha256(bytes([i])).digest() for i in range(7)]
+        root, proofs = _merkle_root_and_proofs(leaves)
+        for i, leaf in enumerate(leaves):
+            assert verify_receipt_merkle_proof(leaf, i, proofs[i], root)
+        assert not verify_receipt_merkle_proof(leaves[0], 1, proofs[1], root)
+
+    def test_high_danger_signed_immediately(self):
+        reg, db = _make_registry()
+        cred = self._issue(reg)
+        low_id = reg.record_receipt(cred.credential_id, "hive:monitor/v1", "get_info", {})
+        receipt_id = reg.record_receipt(
+            cred.credential_id, "hive:fee-policy/v1", "set_single",
+            {"channel_id": "abc", "fee_ppm": 50},
+        )
+        assert receipt_id in db.receipts
+        assert db.receipts[receipt_id]["executor_signature"] == "fakesig123"
+        assert db.receipts[low_id]["executor_signature"] == RECEIPT_SIGNATURE_PENDING
+        # HSM signs the fixed-length payload digest, not the JSON
+        signed = reg.rpc.signmessage.call_args[0][0]
+        assert len(signed) == 64 and not signed.startswith("{")
+
+    def test_batch_signing_failure_requeues_batch(self):
+        reg, db = _make_registry()
+        cred = self._issue(reg)
+        receipt_id = reg.record_receipt(cred.credential_id, "hive:monitor/v1", "get_info", {})
+        reg.rpc.signmessage.side_effect = Exception("HSM unavailable")
+        assert reg.flush_pending_receipts() is False
+        # Stored but still unsigned, and kept queued for a retry
+        assert db.receipts[receipt_id]["executor_signature"] == RECEIPT_SIGNATURE_PENDING
+        reg.rpc.signmessage.side_effect = None
+        assert reg.flush_pending_receipts() is True
+        sig = json.loads(db.receipts[receipt_id]["executor_signature"])
+        assert sig["batch_signature"] == "fakesig123"
+        assert sig["leaf_count"] == 1
+
+    def test_requeue_unsigned_receipts_after_restart(self):
+        reg, db = _make_registry()
+        cred = self._issue(reg)
+        ids = [
+            reg.record_receipt(cred.credential_id, "hive:monitor/v1", "get_info",
+                               {"n": i}, result={"ok": True})
+            for i in range(3)
+        ]
+        leaves = [entry["leaf"] for entry in reg._pending_low_danger]
+
+        # A fresh registry over the same DB picks up the unsigned receipts
+        restarted, _ = _make_registry()
+        restarted.db = db
+        assert restarted.requeue_unsigned_receipts() == 3
+        assert [e["leaf"] for e in restarted._pending_low_danger] == leaves
+        assert restarted.flush_pending_receipts() is True
+        restarted.stop()
+        assert all(db.receipts[r]["executor_signature"] != RECEIPT_SIGNATURE_PENDING
+                   for r in ids)
+
+    def test_aged_receipts_flushed_by_worker(self, monkeypatch):
+        import modules.management_schemas as ms
+        monkeypatch.setattr(ms, "RECEIPT_BATCH_MAX_AGE_SECONDS", 0)
+        reg, db = _make_registry()
+        cred = self._issue(reg)
+        receipt_id = reg.record_receipt(cred.credential_id, "hive:monitor/v1", "get_info", {})
+        deadline = time.time() + 2
+        while (db.receipts[receipt_id]["executor_signature"] == RECEIPT_SIGNATURE_PENDING
+               and time.time() < deadline):
+            time.sleep(0.01)
+        reg.stop()
+        assert db.receipts[receipt_id]["executor_signature"] != RECEIPT_SIGNATURE_PENDING
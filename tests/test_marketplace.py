@@ -7,6 +7,7 @@ from unittest.mock import MagicMock
 import pytest
 
 from modules.database import HiveDatabase
+from modules import marketplace as marketplace_module
 from modules.marketplace import MarketplaceManager
 from modules.nostr_transport import NostrTransport
 
@@ -226,3 +227,280 @@ def test_evaluate_expired_trials_updates_contract_status(manager, database):
         (contract_id,),
     ).fetchone()
     assert row["status"] == "terminated"
+
+
+def test_dumps_matches_stdlib_sorted_compact():
+    obj = {"b": [1, 2, {"z": True, "a": None}], "a": "caf\u00e9", "c": 1e16}
+    expected = json.dumps(obj, sort_keys=True, separators=(",", ":"))
+    assert marketplace_module._dumps(obj) == expected
+    assert marketplace_module._loads(expected) == obj
+    # Integers beyond 64 bits round-trip exactly
+    assert marketplace_module._loads(marketplace_module._dumps({"n": 2**70})) == {"n": 2**70}
+
+
+def test_republish_reuses_cached_serialization(manager, monkeypatch):
+    profile = {
+        "advisor_did": "did:cid:advisor1",
+        "capabilities": {"primary": ["fee-optimization"]},
+        "pricing": {"model": "flat"},
+    }
+    assert manager.publish_profile(profile)["ok"] is True
+    manager._last_profile_publish_at = 0
+
+    calls = []
+    monkeypatch.setattr(marketplace_module, "_dumps", lambda obj: calls.append(obj) or "{}")
+    result = manager.republish_profile()
+    assert result["ok"] is True
+    assert calls == []
+
+    # Replacing the profile drops the cached encoding
+    manager.set_our_profile(dict(profile, version="2"))
+    manager._last_profile_publish_at = 0
+    manager.republish_profile()
+    assert calls
+    # capabilities/pricing are encoded once and spliced into profile_json
+    assert sum(1 for obj in calls if obj is profile["capabilities"]) == 1
+    assert sum(1 for obj in calls if obj is profile["pricing"]) == 1
+
+
+def test_evaluate_expired_trials_ignores_previously_failed_trials(manager, database):
+    proposal = manager.propose_contract(
+        advisor_did="did:cid:advisor-retry",
+        node_id="02" + "cd" * 32,
+        scope={"scope": "monitor"},
+        tier="standard",
+        pricing={},
+    )
+    contract_id = proposal["contract_id"]
+    first = manager.start_trial(contract_id, duration_days=1)
+    assert manager.evaluate_trial(contract_id, {"actions_taken": 0})["outcome"] == "fail"
+    assert manager.start_trial(contract_id, duration_days=1)["ok"] is True
+
+    conn = database._get_connection()
+    conn.execute(
+        "UPDATE marketplace_trials SET end_at = ? WHERE trial_id = ?",
+        (int(time.time()) - 10, first["trial_id"]),
+    )
+    assert manager.evaluate_expired_trials() == 0
+    row = conn.execute(
+        "SELECT status FROM marketplace_contracts WHERE contract_id = ?",
+        (contract_id,),
+    ).fetchone()
+    assert row["status"] == "trial"
+
+
+@pytest.mark.parametrize("sql,params,index", [
+    ("SELECT COUNT(*) FROM marketplace_trials WHERE node_id = ? AND outcome IS NULL",
+     ("n",), "idx_trial_open_node"),
+    ("SELECT trial_id FROM marketplace_trials WHERE end_at < ? AND outcome IS NULL",
+     (0,), "idx_trial_open_end"),
+    ("SELECT * FROM marketplace_trials WHERE contract_id = ? ORDER BY start_at DESC LIMIT 1",
+     ("c",), "idx_trial_contract"),
+    ("SELECT * FROM marketplace_contracts WHERE status = 'active' AND contract_end IS NOT NULL "
+     "AND contract_end > ?", (0,), "idx_contract_status_end"),
+])
+def test_marketplace_queries_use_indexes(database, sql, params, index):
+    conn = database._get_connection()
+    plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+    assert index in plan
+
+
+def test_has_at_least_rows_probe(manager, database):
+    assert database.has_at_least_rows("marketplace_contracts", 1) is False
+    assert database.has_at_least_rows("marketplace_contracts", 0) is True
+    for _ in range(3):
+        manager.propose_contract("did:cid:a", "02" + "aa" * 32, {}, "standard", {})
+    assert database.has_at_least_rows("marketplace_contracts", 3) is True
+    assert database.has_at_least_rows("marketplace_contracts", 4) is False
+    with pytest.raises(ValueError):
+        database.has_at_least_rows("hive_members", 1)
+
+
+def test_discover_filters_in_sql(manager, database):
+    for i, specs in enumerate([["rebalancing"], ["fee-optimization"], []]):
+        manager.publish_profile({
+            "advisor_did": f"did:cid:adv{i}",
+            "specializations": specs,
+            "reputation_score": 40 + i * 20,
+        })
+    found = manager.discover_advisors({"specialization": "fee-optimization"})
+    assert [p["advisor_did"] for p in found] == ["did:cid:adv1"]
+    assert found[0]["profile"]["specializations"] == ["fee-optimization"]
+
+    found = manager.discover_advisors({"min_reputation": 60})
+    assert [p["advisor_did"] for p in found] == ["did:cid:adv2", "did:cid:adv1"]
+
+    conn = database._get_connection()
+    plan = " ".join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM marketplace_profiles WHERE reputation_score >= 0 "
+        "ORDER BY reputation_score DESC, last_seen DESC LIMIT 10"))
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.parametrize("advisor_did,expect_dm", [
+    ("ab" * 32, True),
+    ("AB" * 32, True),
+    ("ab" * 32 + "\n", False),
+    ("gg" * 32, False),
+    ("ab" * 31, False),
+])
+def test_propose_contract_dm_requires_hex_pubkey(manager, advisor_did, expect_dm):
+    result = manager.propose_contract(advisor_did, "02" + "aa" * 32, {}, "standard", {})
+    assert result["ok"] is True
+    assert (result["dm_event_id"] is not None) == expect_dm
+
+
+def test_trial_active_cap_and_sequence(manager):
+    node_id = "02" + "9a" * 32
+    contracts = [
+        manager.propose_contract("did:cid:same", node_id, {"scope": "fees"}, "standard", {})["contract_id"]
+        for _ in range(3)
+    ]
+    first = manager.start_trial(contracts[0])
+    second = manager.start_trial(contracts[1])
+    assert (first["sequence_number"], second["sequence_number"]) == (1, 2)
+    assert manager.start_trial(contracts[2]) == {"error": "max active trials reached"}
+
+    manager.evaluate_trial(contracts[0], {"actions_taken": 0})
+    third = manager.start_trial(contracts[2])
+    assert third["ok"] is True
+    assert third["sequence_number"] == 3
+
+
+@pytest.mark.parametrize("tier", ["standard", None])
+def test_contract_proposal_encoding_matches_dict_dump(tier):
+    scope = {"scope": "fee-policy", "limits": {"z": 1, "a": "é"}}
+    pricing = {"model": "flat", "amount_sats": 500}
+    encoded = marketplace_module._encode_contract_proposal(
+        "cid", "did:cid:x", "02" + "aa" * 32, tier,
+        marketplace_module._dumps(scope), marketplace_module._dumps(pricing),
+    )
+    assert encoded == marketplace_module._dumps({
+        "type": "contract_proposal",
+        "contract_id": "cid",
+        "advisor_did": "did:cid:x",
+        "node_id": "02" + "aa" * 32,
+        "tier": tier,
+        "scope": scope,
+        "pricing": pricing,
+    })
+
+
+def test_new_id_format():
+    ids = {marketplace_module._new_id() for _ in range(100)}
+    assert len(ids) == 100
+    for new_id in ids:
+        assert [len(part) for part in new_id.split("-")] == [8, 4, 4, 4, 12]
+        int(new_id.replace("-", ""), 16)
+
+
+def test_check_contract_renewals_notice_window(manager, database):
+    now = int(time.time())
+    conn = database._get_connection()
+    ids = {}
+    for name, end_offset, notice_days in [
+        ("soon", 3 * 86400, 7),
+        ("far", 30 * 86400, 7),
+        ("long_notice", 20 * 86400, 30),
+        ("expired", -86400, 7),
+    ]:
+        cid = manager.propose_contract("did:cid:r", "02" + "aa" * 32, {}, "standard", {})["contract_id"]
+        manager.accept_contract(cid)
+        conn.execute(
+            "UPDATE marketplace_contracts SET contract_end = ?, notice_days = ? WHERE contract_id = ?",
+            (now + end_offset, notice_days, cid),
+        )
+        ids[cid] = name
+    notices = manager.check_contract_renewals()
+    assert [ids[c["contract_id"]] for c in notices] == ["soon", "long_notice"]
+
+
+def test_encode_profile_matches_full_encoding():
+    profile = {
+        "advisor_did": "did:cid:advisor1",
+        "capabilities": {"primary": ["fee-optimization"], "extra": [1, 2]},
+        "pricing": {"model": "flat", "amount_sats": 1000},
+        "version": "1",
+        "zeta": None,
+    }
+    encoded = marketplace_module._encode_profile(profile)
+    assert encoded["profile_json"] == marketplace_module._dumps(profile)
+    assert encoded["capabilities_json"] == marketplace_module._dumps(profile["capabilities"])
+    assert encoded["pricing_json"] == marketplace_module._dumps(profile["pricing"])
+
+
+def test_cleanup_stale_profiles_in_batches(manager, database):
+    now = int(time.time())
+    conn = database._get_connection()
+    for i in range(7):
+        last_seen = now - (95 * 86400) if i < 5 else now
+        conn.execute(
+            "INSERT INTO marketplace_profiles (advisor_did, profile_json, nostr_pubkey, version, capabilities_json, "
+            "pricing_json, reputation_score, last_seen, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (f"did:cid:batch{i}", "{}", "", "1", "{}", "{}", 10, last_seen, "nostr"),
+        )
+    manager.PROFILE_CLEANUP_BATCH_SIZE = 2
+    assert manager.cleanup_stale_profiles() == 5
+    remaining = conn.execute("SELECT COUNT(*) FROM marketplace_profiles").fetchone()[0]
+    assert remaining == 2
+
+
+def test_discover_advisors_reuses_decoded_profiles(manager, monkeypatch):
+    profile = {
+        "advisor_did": "did:cid:advisor1",
+        "specializations": ["rebalancing"],
+        "capabilities": {},
+        "pricing": {},
+    }
+    assert manager.publish_profile(profile)["ok"] is True
+    first = manager.discover_advisors({})
+    assert first[0]["profile"]["specializations"] == ["rebalancing"]
+
+    calls = []
+    real_loads = marketplace_module._loads
+    monkeypatch.setattr(marketplace_module, "_loads", lambda data: calls.append(data) or real_loads(data))
+    assert manager.discover_advisors({})[0]["profile"] == first[0]["profile"]
+    assert calls == []
+
+    # A republished profile with new content is decoded again
+    manager.publish_profile(dict(profile, specializations=["fee-optimization"]))
+    again = manager.discover_advisors({})
+    assert again[0]["profile"]["specializations"] == ["fee-optimization"]
+    assert len(calls) == 1
+
+
+def test_decoded_profiles_are_read_only_and_thread_safe(manager, monkeypatch):
+    import copy
+    import threading
+
+    profile = {"advisor_did": "did:cid:advisor1", "specializations": ["rebalancing"],
+               "capabilities": {}, "pricing": {}}
+    assert manager.publish_profile(profile)["ok"] is True
+    shared = manager.discover_advisors({})[0]["profile"]
+    with pytest.raises(TypeError):
+        shared["specializations"].append("x")
+    with pytest.raises(TypeError):
+        shared["advisor_did"] = "other"
+    assert json.loads(json.dumps(shared)) == shared
+    mutable = copy.deepcopy(shared)
+    mutable["specializations"].append("x")
+    assert manager.discover_advisors({})[0]["profile"]["specializations"] == ["rebalancing"]
+
+    # Concurrent decodes that all trigger eviction must not raise
+    monkeypatch.setattr(manager, "MAX_CACHED_PROFILES", 4)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(200):
+                manager._decode_profile_json(f"did:{n}:{i}", '{"n": %d}' % i)
+        except Exception as e:  # pragma: no cover - failure path
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(manager._decoded_profiles) <= 4
@@ -1,12 +1,21 @@
 """Tests for Phase 5A Nostr transport foundation."""
 
+import hashlib
+import json
+import threading
 import time
 from unittest.mock import MagicMock
 
 import pytest
 
 from modules.database import HiveDatabase
-from modules.nostr_transport import NostrTransport
+from modules.nostr_transport import (
+    ExternalCommsTransport,
+    NostrTransport,
+    _canonical_json,
+    _is_hex64_lower,
+    _xor_with_key,
+)
 
 
 @pytest.fixture
@@ -102,3 +111,397 @@ def test_subscribe_filters(mock_plugin, database):
 
     assert transport.unsubscribe(sub_id)
 
+
+
+def test_xor_with_key_matches_bytewise_xor():
+    key = bytes(range(1, 33))
+    for data in [b"", b"\x00\x00abc", bytes(range(256)) * 3, key]:
+        expected = bytes(b ^ key[i % len(key)] for i, b in enumerate(data))
+        assert _xor_with_key(data, key) == expected
+
+
+def test_republish_reuses_signature(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    event = transport.publish({"kind": 1, "content": "hello", "created_at": 1700000000})
+
+    calls = []
+    real_sign = transport._sign_event
+    transport._sign_event = lambda evt, *args: calls.append(evt["id"]) or real_sign(evt, *args)
+
+    again = transport.publish(event)
+    assert again["id"] == event["id"]
+    assert again["sig"] == event["sig"]
+    assert calls == []
+
+    changed = transport.publish(dict(event, content="other"))
+    assert changed["id"] != event["id"]
+    assert calls == [changed["id"]]
+
+
+def test_injected_envelope_builds_plaintext_on_demand(mock_plugin, monkeypatch):
+    import modules.nostr_transport as nostr_module
+
+    transport = ExternalCommsTransport(mock_plugin)
+    received = []
+    transport.receive_dm(lambda env: received.append(env))
+    payload = {"type": "GOSSIP_STATE", "sender": "peer1"}
+
+    dumps_calls = []
+    real_dumps = nostr_module.json.dumps
+    monkeypatch.setattr(nostr_module.json, "dumps", lambda obj, **kw: dumps_calls.append(obj) or real_dumps(obj, **kw))
+
+    transport.inject_packet(payload)
+    assert transport.process_inbound() == 1
+    envelope = received[0]
+    assert envelope.get("payload") is payload
+    assert dumps_calls == []
+
+    assert "plaintext" in envelope
+    assert envelope.get("plaintext") == real_dumps(payload)
+    assert envelope["plaintext"] == real_dumps(payload)
+    assert len(dumps_calls) == 1
+
+
+def test_inbound_queue_drops_new_packets_when_full(mock_plugin):
+    transport = ExternalCommsTransport(mock_plugin)
+    transport.QUEUE_MAX_ITEMS = 3
+    received = []
+    transport.receive_dm(lambda env: received.append(env["payload"]["n"]))
+
+    assert all(transport.inject_packet({"sender": "peer1", "n": n}) for n in range(3))
+    assert transport.inject_packet({"sender": "peer1", "n": 3}) is False
+
+    assert transport.process_inbound(max_events=2) == 2
+    assert transport.process_inbound() == 1
+    assert transport.process_inbound() == 0
+    assert received == [0, 1, 2]
+
+
+def test_is_hex64_lower():
+    assert _is_hex64_lower("ab" * 32)
+    assert _is_hex64_lower("0" * 64)
+    assert not _is_hex64_lower("AB" * 32)
+    assert not _is_hex64_lower("ab" * 31)
+    assert not _is_hex64_lower("zz" * 32)
+    assert not _is_hex64_lower("ab " * 21 + "a")
+
+
+def test_subscription_added_mid_batch_sees_next_batch(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    late = []
+
+    def first(event):
+        if not late and event["content"] == "a":
+            transport.subscribe({}, lambda evt: late.append(evt["content"]))
+
+    transport.subscribe({}, first)
+    transport.inject_event({"kind": 1, "content": "a"})
+    transport.inject_event({"kind": 1, "content": "b"})
+    assert transport.process_inbound() == 2
+    assert late == []
+
+    transport.inject_event({"kind": 1, "content": "c"})
+    assert transport.process_inbound() == 1
+    assert late == ["c"]
+
+
+def test_dm_event_id_matches_generic_encoding(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    for content in ["b64:aGVsbG8=", 'quote " and \\ slash\n', "ünïcödé  "]:
+        event = {
+            "pubkey": transport.get_identity()["pubkey"],
+            "created_at": 1700000000,
+            "kind": 4,
+            "tags": [["p", "cd" * 32]],
+            "content": content,
+        }
+        serial = [0, event["pubkey"], event["created_at"], 4, event["tags"], content]
+        expected = hashlib.sha256(
+            json.dumps(serial, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        assert transport._compute_event_id(event) == expected
+
+
+def test_canonical_json_matches_nip01_serialization():
+    for obj in [
+        [0, "ab" * 32, 1700000000, 1, [["e", "x"], ["p", "y"]], 'tab\there "q" ünï \x01'],
+        [0, "", 2 ** 70, 1, [], ""],
+    ]:
+        expected = json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        assert _canonical_json(obj) == expected
+
+
+def test_outbound_loop_counts_batched_events(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    transport.OUTBOUND_BATCH_SIZE = 16  # 40 events span several wakeups
+    events = [transport.publish({"kind": 1, "content": f"m{i}"}) for i in range(40)]
+    transport.start()
+
+    deadline = time.time() + 2.0
+    while time.time() < deadline:
+        if database.get_nostr_state("event:last_published_id") == events[-1]["id"]:
+            break
+        time.sleep(0.05)
+    transport.stop()
+
+    assert database.get_nostr_state("event:last_published_id") == events[-1]["id"]
+    relays = transport.get_status()["relays"]
+    assert all(relay["published_count"] == 40 for relay in relays.values())
+
+
+def test_sign_event_reuses_private_key_object(mock_plugin, database, monkeypatch):
+    import modules.nostr_transport as nostr_module
+
+    created = []
+    signed = []
+
+    class FakePrivateKey:
+        def __init__(self, secret):
+            created.append(secret)
+            self.public_key = MagicMock()
+            self.public_key.format.return_value = b"\x04" + b"\x11" * 64
+
+        def sign_schnorr(self, msg):
+            signed.append(msg)
+            return b"\x22" * 64
+
+    monkeypatch.setattr(nostr_module, "CoincurvePrivateKey", FakePrivateKey)
+    transport = NostrTransport(mock_plugin, database)
+    # One key object per identity load, shared by pubkey derivation and signing
+    assert len(created) == 1
+    assert transport.get_identity()["pubkey"] == "11" * 32
+    created.clear()
+
+    first = transport.publish({"kind": 1, "content": "a"})
+    second = transport.publish({"kind": 1, "content": "b"})
+    assert first["sig"] == second["sig"] == "22" * 64
+    assert created == []
+    assert signed == [bytes.fromhex(first["id"]), bytes.fromhex(second["id"])]
+
+
+def test_internal_dm_envelope_decodes_plaintext_on_demand(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    envelopes = []
+    transport.receive_dm(lambda env: envelopes.append(env))
+    seen = []
+    transport.subscribe({"kinds": [4]}, lambda evt: seen.append(evt))
+
+    decoded = []
+    real_decode = transport._decode_dm
+    transport._decode_dm = lambda content: decoded.append(content) or real_decode(content)
+
+    event = {"kind": 4, "content": transport._encode_dm("hi"), "plaintext": "stale"}
+    transport.inject_event(event)
+    assert transport.process_inbound() == 1
+    assert decoded == []
+
+    envelope = envelopes[0]
+    assert envelope["plaintext"] == "hi"
+    assert envelope.get("plaintext") == "hi"
+    assert len(decoded) == 1
+    assert seen[0] is event and event["plaintext"] == "stale"
+
+
+def test_dm_encoding_roundtrip(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    for text in ["", "hello", "ünïcödé ✓", '{"type":"x"}']:
+        content = transport._encode_dm(text)
+        assert content.startswith("b64:")
+        assert transport._decode_dm(content) == text
+    assert transport._decode_dm("b64:ü") == ""
+    assert transport._decode_dm("plain") == "plain"
+
+
+def test_external_identity_fetched_once_under_concurrency(mock_plugin):
+    calls = []
+
+    def slow_identity(method, params):
+        calls.append(method)
+        time.sleep(0.05)
+        return {"pubkey": "ab" * 32}
+
+    mock_plugin.rpc.call.side_effect = slow_identity
+    transport = ExternalCommsTransport(mock_plugin)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(transport.get_identity()["pubkey"]))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["ab" * 32] * 8
+    assert calls == ["hive-client-identity"]
+
+
+def test_queue_drop_counters_in_status(mock_plugin, database):
+    external = ExternalCommsTransport(mock_plugin, queue_max_items=2)
+    for n in range(5):
+        external.inject_packet({"sender": "peer1", "n": n})
+    status = external.get_status()
+    assert status["queue_max_items"] == 2
+    assert status["inbound_queue_size"] == 2
+    assert status["inbound_drops"] == 3
+    assert status["inbound_high_water"] == 2
+
+    internal = NostrTransport(mock_plugin, database, queue_max_items=2)
+    for n in range(3):
+        internal.inject_event({"kind": 1, "content": str(n)})
+    internal.publish({"kind": 1, "content": "a"})
+    internal.publish({"kind": 1, "content": "b"})
+    with pytest.raises(RuntimeError):
+        internal.publish({"kind": 1, "content": "c"})
+    status = internal.get_status()
+    assert status["inbound_drops"] == 1
+    assert status["inbound_high_water"] == 2
+    assert status["outbound_drops"] == 1
+    assert status["outbound_queue_size"] == 2
+
+
+def test_subscription_ids_are_unique(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    ids = [transport.subscribe({}, lambda evt: None) for _ in range(50)]
+    assert len(set(ids)) == 50
+    assert transport.unsubscribe(ids[0])
+    assert not transport.unsubscribe(ids[0])
+    assert transport.subscribe({}, lambda evt: None) not in ids
+
+
+def test_compiled_filters_match_nip01_fields():
+    match = NostrTransport._compile_filters({
+        "kinds": [1, 4],
+        "authors": ["aa" * 32],
+        "ids": ["ab", "cd"],
+        "since": 100,
+        "until": 200,
+    })
+    event = {"kind": 4, "pubkey": "aa" * 32, "id": "abff", "created_at": 150}
+    assert match(event)
+    assert not match(dict(event, kind=7))
+    assert not match(dict(event, pubkey="bb" * 32))
+    assert not match(dict(event, id="ffab"))
+    assert match(dict(event, id="cd00"))
+    assert not match(dict(event, created_at=99))
+    assert not match(dict(event, created_at=201))
+    assert NostrTransport._compile_filters({})({"kind": 9})
+    assert NostrTransport._compile_filters({"kinds": []})({"kind": 9})
+
+
+def test_compiled_filters_single_field_shapes():
+    by_kind = NostrTransport._compile_filters({"kinds": [1, 4]})
+    assert by_kind({"kind": 4})
+    assert not by_kind({"kind": 7})
+    assert not by_kind({})
+    by_author = NostrTransport._compile_filters({"authors": ["aa" * 32]})
+    assert by_author({"pubkey": "aa" * 32, "kind": 7})
+    assert not by_author({"pubkey": "bb" * 32})
+
+
+def test_private_key_bytes_decoded_once(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    assert transport._privkey_bytes == bytes.fromhex(transport.get_identity()["privkey"])
+
+    invalid = NostrTransport(mock_plugin, None, privkey_hex="not-hex")
+    assert invalid._privkey_bytes == b""
+    assert _is_hex64_lower(invalid.get_identity()["pubkey"])
+
+
+def test_publish_state_flushed_on_stop(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    transport.STATE_FLUSH_INTERVAL = 3600
+    transport.start()
+    first = transport.publish({"kind": 1, "content": "a"})
+    deadline = time.time() + 2.0
+    while time.time() < deadline and database.get_nostr_state("event:last_published_id") != first["id"]:
+        time.sleep(0.05)
+    assert database.get_nostr_state("event:last_published_id") == first["id"]
+
+    second = transport.publish({"kind": 1, "content": "b"})
+    time.sleep(0.3)
+    assert database.get_nostr_state("event:last_published_id") == first["id"]
+    transport.stop()
+    assert database.get_nostr_state("event:last_published_id") == second["id"]
+
+
+def test_inbound_without_dm_handlers_builds_no_envelopes(mock_plugin, database, monkeypatch):
+    import modules.nostr_transport as nostr_module
+
+    built = []
+    real_envelope = nostr_module._LazyEnvelope
+    monkeypatch.setattr(nostr_module, "_LazyEnvelope", lambda *args: built.append(args) or real_envelope(*args))
+
+    external = ExternalCommsTransport(mock_plugin)
+    external.inject_packet({"sender": "peer1"})
+    assert external.process_inbound() == 1
+
+    internal = NostrTransport(mock_plugin, database)
+    seen = []
+    internal.subscribe({"kinds": [4]}, lambda evt: seen.append(evt))
+    internal.inject_event({"kind": 4, "content": "b64:aGk="})
+    assert internal.process_inbound() == 1
+
+    assert built == []
+    assert len(seen) == 1
+
+
+def test_storage_key_stream_is_cached(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    for value in ["x", "y" * 100, "z" * 10]:
+        assert transport._decrypt_value(transport._encrypt_value(value)) == value
+    stream = transport._tiled_key
+    assert len(stream) > 100
+    transport._encrypt_value("w" * 50)
+    assert transport._tiled_key is stream
+
+
+def test_subscription_index_dispatch(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    calls = []
+    transport.subscribe({"authors": ["aa" * 32]}, lambda evt: calls.append(("author", evt["content"])))
+    kind_sub = transport.subscribe({"kinds": [1, 7]}, lambda evt: calls.append(("kind", evt["content"])))
+    transport.subscribe({}, lambda evt: calls.append(("all", evt["content"])))
+    transport.subscribe({"kinds": [[1]]}, lambda evt: calls.append(("odd", evt["content"])))
+
+    transport.inject_event({"kind": 1, "pubkey": "aa" * 32, "content": "a"})
+    transport.inject_event({"kind": 9, "pubkey": "bb" * 32, "content": "b"})
+    transport.inject_event({"kind": 7, "pubkey": "bb" * 32, "content": "c"})
+    transport.process_inbound()
+    assert calls == [
+        ("author", "a"), ("kind", "a"), ("all", "a"),
+        ("all", "b"),
+        ("kind", "c"), ("all", "c"),
+    ]
+
+    calls.clear()
+    assert transport.unsubscribe(kind_sub)
+    transport.inject_event({"kind": 7, "pubkey": "aa" * 32, "content": "d"})
+    transport.process_inbound()
+    assert calls == [("author", "d"), ("all", "d")]
+
+
+def test_event_id_prefix_matches_full_serialization(mock_plugin, database):
+    transport = NostrTransport(mock_plugin, database)
+    ours = transport.get_identity()["pubkey"]
+    for pubkey in [ours, "ee" * 32]:
+        event = {
+            "pubkey": pubkey,
+            "created_at": 1700000000,
+            "kind": 38901,
+            "tags": [["d", "x"], ["t", "ünï"]],
+            "content": '{"a": "\\n"}',
+        }
+        serial = [0, pubkey, 1700000000, 38901, event["tags"], event["content"]]
+        expected = hashlib.sha256(
+            json.dumps(serial, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        assert transport._compute_event_id(event) == expected
+
+
+def test_fallback_signature_unchanged(mock_plugin, database, monkeypatch):
+    import modules.nostr_transport as nostr_module
+
+    monkeypatch.setattr(nostr_module, "CoincurvePrivateKey", None)
+    transport = NostrTransport(mock_plugin, database)
+    event = transport.publish({"kind": 1, "content": "hello"})
+    privkey = transport.get_identity()["privkey"]
+    assert event["sig"] == hashlib.sha256((event["id"] + privkey).encode("utf-8")).hexdigest()
@@ -274,7 +274,7 @@ class TestInjectPacketRPC:
 
         assert isinstance(transport, ExternalCommsTransport)
         transport.inject_packet({"type": "test", "sender": "abc"})
-        assert transport._inbound_queue.qsize() == 1
+        assert len(transport._inbound_queue) == 1
 
 
 # ---------------------------------------------------------------------------
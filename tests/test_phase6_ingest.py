@@ -16,6 +16,17 @@ def test_coerce_hive_message_type_accepts_name_and_int():
     assert coerce_hive_message_type(int(HiveMessageType.GOSSIP)) == HiveMessageType.GOSSIP
 
 
+def test_coerce_hive_message_type_rejects_unknown_values():
+    assert coerce_hive_message_type(str(int(HiveMessageType.GOSSIP))) == HiveMessageType.GOSSIP
+    assert coerce_hive_message_type(" gossip ") == HiveMessageType.GOSSIP
+    assert coerce_hive_message_type(1) is None
+    assert coerce_hive_message_type("1") is None
+    assert coerce_hive_message_type("not-a-type") is None
+    assert coerce_hive_message_type("") is None
+    assert coerce_hive_message_type(None) is None
+    assert coerce_hive_message_type(1.5) is None
+
+
 def test_parse_injected_packet_with_canonical_envelope():
     packet = {
         "sender": "02" + "a" * 64,
@@ -69,3 +80,39 @@ def test_parse_injected_packet_returns_none_for_unrecognized_payload():
     assert peer_id == "peer4"
     assert msg_type is None
     assert payload is None
+
+
+def test_parse_injected_packet_copies_payload_only_when_extending_it():
+    payload = {"k": 1}
+    _, _, parsed = parse_injected_hive_packet({"type": "gossip", "payload": payload, "sender": "p"})
+    assert parsed is payload
+
+    _, _, parsed = parse_injected_hive_packet({"type": "gossip", "version": 2, "payload": payload, "sender": "p"})
+    assert parsed == {"k": 1, "_envelope_version": 2}
+    assert payload == {"k": 1}
+
+
+def test_parse_injected_packet_raw_plaintext_prefilters():
+    wire = serialize(HiveMessageType.GOSSIP, {"k": 1})
+    spaced = " ".join(wire.hex()[i:i + 2] for i in range(0, len(wire.hex()), 2))
+    _, msg_type, _ = parse_injected_hive_packet({"raw_plaintext": spaced, "sender": "p"})
+    assert msg_type == HiveMessageType.GOSSIP
+
+    for raw in ["not hex at all", "abc", "[1, 2]", "12345"]:
+        assert parse_injected_hive_packet({"raw_plaintext": raw, "sender": "p"}) == ("p", None, None)
+
+
+def test_parse_injected_packet_raw_json_with_stdlib_only_values():
+    raw = '{"type": "gossip", "payload": {"x": NaN}, "sender": "p"}'
+    _, msg_type, payload = parse_injected_hive_packet({"raw_plaintext": raw})
+    assert msg_type == HiveMessageType.GOSSIP
+    assert payload["x"] != payload["x"]  # NaN survives the orjson fallback
+
+
+def test_parse_injected_packet_nested_raw_plaintext_json():
+    wire = serialize(HiveMessageType.GOSSIP, {"k": 1})
+    raw = json.dumps({"raw_plaintext": wire.hex()})
+    peer_id, msg_type, payload = parse_injected_hive_packet({"raw_plaintext": raw, "sender": "p"})
+    assert peer_id == "p"
+    assert msg_type == HiveMessageType.GOSSIP
+    assert payload["k"] == 1
@@ -574,3 +574,73 @@ class TestWeightConstants:
         assert WEIGHT_CAPACITY == 0.30
         assert WEIGHT_FORWARDS == 0.60
         assert WEIGHT_UPTIME == 0.10
+
+
+class TestNetworkEnrichment:
+    """Network-optimized fair shares read one metrics snapshot."""
+
+    def test_enrichment_uses_single_snapshot(self):
+        mgr = _make_manager()
+        calculator = MagicMock()
+        calculator.get_all_metrics.return_value = {
+            "02a": MagicMock(hive_centrality=0.9, rebalance_hub_score=0.5),
+        }
+        contribs = [
+            MemberContribution(peer_id=pid, capacity_sats=1000, forwards_sats=10,
+                               fees_earned_sats=500, uptime_pct=1.0)
+            for pid in ("02a", "02b")
+        ]
+        with patch("modules.settlement.network_metrics.get_calculator", return_value=calculator):
+            mgr.calculate_fair_shares(contribs, network_optimized=True)
+
+        calculator.get_all_metrics.assert_called_once_with()
+        calculator.get_member_metrics.assert_not_called()
+        assert contribs[0].hive_centrality == 0.9
+        assert contribs[1].hive_centrality == 0.0
+
+
+class TestPlanMemo:
+    """compute_settlement_plan() memoizes by its exact inputs."""
+
+    def test_repeat_snapshot_reuses_plan(self):
+        mgr = _make_manager()
+        members = [("02a", 5000, 10, 1000, 100), ("02b", 100, 50, 1000, 100)]
+        plan = mgr.compute_settlement_plan("2026-10", _make_contributions(members))
+        with patch.object(mgr, "_build_settlement_plan") as build:
+            assert mgr.compute_settlement_plan("2026-10", _make_contributions(members)) is plan
+        build.assert_not_called()
+
+    def test_inputs_outside_data_hash_still_miss(self):
+        mgr = _make_manager()
+        members = [("02a", 5000, 10, 1000, 100), ("02b", 100, 50, 1000, 100)]
+        plan = mgr.compute_settlement_plan("2026-10", _make_contributions(members))
+        # forward_count is not part of data_hash but changes fair shares
+        shifted = [("02a", 5000, 90, 1000, 100), ("02b", 100, 5, 1000, 100)]
+        other = mgr.compute_settlement_plan("2026-10", _make_contributions(shifted))
+        assert other["data_hash"] == plan["data_hash"]
+        assert other["plan_hash"] != plan["plan_hash"]
+        # 100.0 == 100 as a dict key, but data_hash formats it as "100.0"
+        as_float = _make_contributions([(m[0], m[1], m[2], m[3], float(m[4])) for m in members])
+        assert mgr.compute_settlement_plan("2026-10", as_float)["data_hash"] != plan["data_hash"]
+
+    def test_equal_values_with_different_formatting_miss(self):
+        mgr = _make_manager()
+        contribs = _make_contributions([("02a", 5000, 10, 1000, 0.0), ("02b", 100, 50, 1000, 100)])
+        plan = mgr.compute_settlement_plan("2026-10", contribs)
+        # -0.0 == 0.0 and hashes the same, but data_hash writes "-0.0"
+        contribs[0]["uptime"] = -0.0
+        other = mgr.compute_settlement_plan("2026-10", contribs)
+        assert other["data_hash"] == mgr.calculate_settlement_hash("2026-10", contribs)
+        assert other["data_hash"] != plan["data_hash"]
+        # An explicit None is not the same input as a missing field
+        contribs[0]["uptime"] = None
+        with_none = mgr.compute_settlement_plan("2026-10", contribs)
+        del contribs[0]["uptime"]
+        missing = mgr.compute_settlement_plan("2026-10", contribs)
+        assert with_none["data_hash"] != missing["data_hash"]
+
+    def test_memo_is_bounded(self):
+        mgr = _make_manager()
+        for fees in range(mgr.MAX_CACHED_PLANS + 5):
+            mgr.compute_settlement_plan("2026-10", _make_contributions([("02a", fees, 1, 1, 100)]))
+        assert len(mgr._plan_cache) <= mgr.MAX_CACHED_PLANS
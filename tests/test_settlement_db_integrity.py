@@ -2,8 +2,11 @@
 Tests for settlement database integrity guards.
 """
 
+import sqlite3
 from unittest.mock import MagicMock
 
+import pytest
+
 from modules.database import HiveDatabase
 
 
@@ -68,3 +71,85 @@ def test_ready_vote_and_execution_accept_known_proposal(tmp_path):
 
     assert vote_ok is True
     assert exec_ok is True
+
+
+def test_settlement_tables_index_lookup_paths(tmp_path):
+    from modules.settlement import SettlementManager
+
+    db = _make_db(tmp_path)
+    mgr = SettlementManager(db, MagicMock())
+    mgr.initialize_tables()
+    conn = db._get_connection()
+    # Legacy index from older schemas is dropped on the next start
+    conn.execute("CREATE INDEX idx_settlement_contrib_period ON settlement_contributions(period_id)")
+    mgr.initialize_tables()
+
+    names = {
+        row["name"]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall()
+    }
+    assert "idx_settlement_contrib_period" not in names
+    assert "idx_settlement_payments_period" not in names
+    assert "idx_settlement_contrib_peer_period" in names
+    assert "idx_settlement_payments_period_route" in names
+
+
+def test_record_contributions_batches_and_rerecords(tmp_path):
+    from modules.settlement import MemberContribution, SettlementManager, SettlementResult
+
+    db = _make_db(tmp_path)
+    mgr = SettlementManager(db, MagicMock())
+    mgr.initialize_tables()
+    period_id = mgr.create_settlement_period()
+    contribs = [
+        MemberContribution(peer_id=pid, capacity_sats=1000, forwards_sats=5,
+                           fees_earned_sats=fees, uptime_pct=1.0)
+        for pid, fees in (("a", 300), ("b", 100))
+    ]
+    results = [
+        SettlementResult(peer_id="a", fees_earned=300, fair_share=200, balance=-100, net_profit=300),
+        SettlementResult(peer_id="b", fees_earned=100, fair_share=200, balance=100, net_profit=100),
+        SettlementResult(peer_id="ghost", fees_earned=0, fair_share=0, balance=0),
+    ]
+    mgr.record_contributions(period_id, results, contribs)
+    results[0].fair_share = 250
+    mgr.record_contributions(period_id, results, contribs)
+
+    details = mgr.get_period_details(period_id)
+    rows = {c["peer_id"]: c for c in details["contributions"]}
+    assert set(rows) == {"a", "b"}
+    assert rows["a"]["fair_share_sats"] == 250
+    assert details["period"]["total_fees_sats"] == 400
+    assert details["period"]["total_members"] == 3
+
+
+def test_get_offers_returns_active_offers_only(tmp_path):
+    from modules.settlement import SettlementManager
+
+    db = _make_db(tmp_path)
+    mgr = SettlementManager(db, MagicMock())
+    mgr.initialize_tables()
+    mgr.register_offer("a", "lno1aaa")
+    mgr.register_offer("b", "lno1bbb")
+    mgr.deactivate_offer("b")
+
+    assert mgr.get_offers(["a", "b", "c", "a"]) == {"a": "lno1aaa"}
+    assert mgr.get_offers([]) == {}
+
+
+def test_record_payments_is_atomic(tmp_path):
+    from modules.settlement import SettlementManager, SettlementPayment
+
+    db = _make_db(tmp_path)
+    mgr = SettlementManager(db, MagicMock())
+    mgr.initialize_tables()
+    period_id = mgr.create_settlement_period()
+    good = SettlementPayment(from_peer="a", to_peer="b", amount_sats=500, bolt12_offer="lno1b")
+    bad = SettlementPayment(from_peer="a", to_peer="c", amount_sats=500, bolt12_offer=None)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        mgr.record_payments(period_id, [good, bad])
+    assert mgr.get_period_details(period_id)["payments"] == []
+
+    mgr.record_payments(period_id, [good])
+    assert len(mgr.get_period_details(period_id)["payments"]) == 1